@@ -12,7 +12,7 @@ if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
 # 새롭게 분리된 모듈 임포트
-from src.core import processor
+from src.core import processor, watcher
 from src.ui import styles
 from src.ui.tabs import workspace, chronicle, statistics, settings, help as help_tab
 
@@ -73,6 +73,7 @@ with st.sidebar:
         st.session_state['mode'] = 'help'
         st.rerun()
     
+    settings.render_sync_badge(DB_PATH)
     st.divider()
     
     if st.button("❌ 프로그램 완전 종료", type="primary", use_container_width=True):
@@ -91,7 +92,8 @@ with st.sidebar:
 def load_config():
     if os.path.exists(CONFIG_FILE):
         with open(CONFIG_FILE, 'r', encoding='utf-8') as f: return json.load(f)
-    return {"target_folder": "sermons", "ui_height": 650}
+    return {"target_folder": "sermons", "ui_height": 650, "extract_mode": "process", "extract_workers": 0,
+            "extract_timeout": 120, "extract_memory_mb": 1024}
 
 def save_config(c):
     with open(CONFIG_FILE, 'w', encoding='utf-8') as f: json.dump(c, f, indent=4)
@@ -106,6 +108,13 @@ config = load_config()
 #         if cnt > 0: st.toast(f"🎉 새 설교 {cnt}편 업데이트 완료!")
 #     st.session_state['startup_sync_done'] = True
 
+# 폴더 감시 (설정에서 켠 경우): 전체를 훑지 않고 바뀐 파일만 백그라운드에서 반영 (연결되지 않은 USB 등은 다음 실행 때)
+watch_roots = [root for root in settings.library_roots(config) if os.path.isdir(root)]
+if config.get("watch_folder") and watcher.is_available() and watch_roots:
+    watcher.start_all({root: settings.sync_options(config, root) for root in watch_roots}, DB_PATH, config.get("skip_folders", []))
+else:
+    watcher.stop(DB_PATH)
+
 if 'mode' not in st.session_state: st.session_state['mode'] = 'main_menu'
 
 # ==========================================
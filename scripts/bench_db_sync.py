@@ -0,0 +1,43 @@
+"""
+동기화 DB 쓰기 벤치마크
+임시 폴더에 설교 txt를 만들어 동기화한 뒤, 폴더를 통째로 옮기거나 지웠을 때의 동기화 시간을 잽니다.
+(삭제/갱신이 DB에 얼마나 빨리 반영되는지 보려는 것이므로 추출이 빠른 txt만 사용)
+
+사용법: python scripts/bench_db_sync.py [파일 수]
+"""
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import processor
+
+BODY = "창세기 1:1 태초에 하나님이 천지를 창조하시니라. 땅이 혼돈하고 공허하며 흑암이 깊음 위에 있고 " * 40
+
+def build_library(folder, count):
+    for i in range(count):
+        sub = os.path.join(folder, "설교", str(2000 + i % 20))
+        os.makedirs(sub, exist_ok=True)
+        with open(os.path.join(sub, f"{2000 + i % 20}-01-01 설교 {i}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"{i}번째 설교 {BODY}")
+
+def timed(label, func):
+    start = time.perf_counter()
+    cnt, msg = func()
+    print(f"{label:<22}: {time.perf_counter() - start:7.2f}초  ({msg})")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, "library")
+        db_path = os.path.join(tmp, "library.db")
+        build_library(folder, count)
+        processor.init_db(db_path)
+        timed("첫 동기화", lambda: processor.sync_files(folder, db_path))
+        shutil.move(os.path.join(folder, "설교"), os.path.join(folder, "옮긴 설교"))
+        timed("폴더 이동 후 동기화", lambda: processor.sync_files(folder, db_path))
+        shutil.rmtree(os.path.join(folder, "옮긴 설교"))
+        timed("폴더 삭제 후 동기화", lambda: processor.sync_files(folder, db_path))
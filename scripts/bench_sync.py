@@ -0,0 +1,67 @@
+"""
+동기화 폴더 탐색 벤치마크
+임시 폴더에 큰 설교 트리를 만든 뒤, 이전 방식(glob + 확장자 필터 + 파일마다 getmtime 한 번)과
+scanner.scan_files(os.scandir 한 번 + DirEntry stat 재사용)의 탐색 시간을 비교합니다.
+scan_files_parallel(클라우드 드라이브용 동시 탐색)도 함께 잽니다. 로컬 디스크에서는 이득이 없고,
+폴더 읽기/stat 한 번이 왕복 지연인 네트워크 드라이브에서 빨라집니다.
+
+사용법: python scripts/bench_sync.py [연도 폴더 수] [폴더당 파일 수]
+"""
+import glob
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import scanner
+
+def build_tree(root, years, per_folder):
+    for y in range(years):
+        for m in range(1, 13):
+            folder = os.path.join(root, str(2000 + y), f"{m:02d}월")
+            os.makedirs(folder)
+            for i in range(per_folder):
+                # 설교 파일 사이에 동기화 대상이 아닌 파일도 섞어 둠
+                ext = (".hwp", ".docx", ".pdf", ".txt", ".jpg")[i % 5]
+                with open(os.path.join(folder, f"{2000 + y}-{m:02d}-{i:02d} 설교{ext}"), "w") as f:
+                    f.write("x")
+
+def old_walk(root):
+    # 이전 sync_files의 바뀐 파일 없는 동기화: 파일명으로 구분하고 변경 감지에 getmtime 한 번
+    # (바뀐 파일만 _process_single_file에서 getmtime을 한 번 더 부름)
+    files = glob.glob(os.path.join(root, "**/*.*"), recursive=True)
+    files = [f for f in files if f.lower().endswith(('.docx', '.hwp', '.hwpx', '.pdf', '.txt'))]
+    return {os.path.basename(f): os.path.getmtime(f) for f in files}
+
+def new_walk(root):
+    return {rel_path: (size, mtime) for rel_path, _, size, mtime in scanner.scan_files(root)}
+
+def parallel_walk(root):
+    return {rel_path: (size, mtime) for rel_path, _, size, mtime in scanner.scan_files_parallel(root)}
+
+def best_of(func, root, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(root)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+if __name__ == "__main__":
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    per_folder = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, years, per_folder)
+        old_time, old_result = best_of(old_walk, root)
+        new_time, new_result = best_of(new_walk, root)
+        parallel_time, parallel_result = best_of(parallel_walk, root)
+        assert new_result == parallel_result
+        # 이전 방식은 크기를 읽지 않았고 파일명으로 구분함 (트리의 파일명은 서로 다름)
+        assert old_result == {rel_path.rsplit("/", 1)[-1]: mtime for rel_path, (_, mtime) in new_result.items()}
+        print(f"파일 {len(new_result)}개 (폴더 {years * 12}개)")
+        print(f"glob + getmtime : {old_time * 1000:8.1f} ms")
+        print(f"scandir         : {new_time * 1000:8.1f} ms  ({old_time / new_time:.1f}배)")
+        print(f"scandir 동시    : {parallel_time * 1000:8.1f} ms  ({old_time / parallel_time:.1f}배)")
@@ -2,6 +2,7 @@
 import streamlit.web.cli as stcli
 import os, sys
 import subprocess
+import multiprocessing
 import webbrowser
 from threading import Timer
 
@@ -45,6 +46,9 @@ def open_browser():
         webbrowser.open_new(url)
 
 if __name__ == "__main__":
+    # [중요] 동기화의 추출 프로세스 풀(spawn)이 exe를 다시 실행할 때 서버 대신 작업자로 동작하게 함
+    multiprocessing.freeze_support()
+    
     # subprocess는 파일 상단에서 import됨
     
     # 환경설정
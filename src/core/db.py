@@ -0,0 +1,77 @@
+"""
+SQLite 연결 관리
+프로세스 전체에서 DB마다 읽기 연결은 풀로 재사용하고, 쓰기 연결은 하나만 두어 잠금으로 직렬화합니다.
+Streamlit은 상호작용마다 스크립트를 다시 실행하므로 매번 connect/close 하지 않도록 합니다.
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# DB마다 보관할 유휴 읽기 연결 수 (초과분은 반납 시 닫음)
+READ_POOL_SIZE = 4
+
+_lock = threading.Lock()
+_read_pools = {}
+_writers = {}
+
+def _connect(db_path):
+    # 풀의 연결은 여러 스레드가 번갈아 빌려 쓰므로 check_same_thread를 끔 (동시에 한 스레드만 사용)
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+@contextmanager
+def reader(db_path):
+    """
+    읽기 연결을 빌려 줍니다. with 블록이 끝나면 풀로 돌려받습니다.
+    """
+    with _lock:
+        pool = _read_pools.setdefault(db_path, [])
+        conn = pool.pop() if pool else None
+    if conn is None:
+        conn = _connect(db_path)
+    try:
+        yield conn
+    finally:
+        # 읽기 도중 예외가 나도 열린 트랜잭션(스냅샷)을 남기지 않음
+        if conn.in_transaction:
+            conn.rollback()
+        with _lock:
+            pool = _read_pools.setdefault(db_path, [])
+            if len(pool) < READ_POOL_SIZE:
+                pool.append(conn)
+                conn = None
+        if conn is not None:
+            conn.close()
+
+@contextmanager
+def writer(db_path):
+    """
+    DB의 유일한 쓰기 연결을 잠금과 함께 빌려 줍니다.
+    블록이 정상 종료하면 commit, 예외가 나면 rollback 합니다.
+    """
+    with _lock:
+        if db_path not in _writers:
+            _writers[db_path] = (_connect(db_path), threading.RLock())
+        conn, write_lock = _writers[db_path]
+    with write_lock:
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+def close_all(db_path):
+    """
+    DB의 모든 연결을 닫습니다. (DB 파일을 지우기 전에 호출, Windows는 열린 파일을 지울 수 없음)
+    """
+    with _lock:
+        pool = _read_pools.pop(db_path, [])
+        conn_lock = _writers.pop(db_path, None)
+    for conn in pool:
+        conn.close()
+    if conn_lock:
+        conn, write_lock = conn_lock
+        with write_lock:
+            conn.close()
@@ -0,0 +1,75 @@
+"""
+추출 결과 디스크 캐시
+파일 내용 해시 + 확장자 + extractors.EXTRACTOR_VERSION을 키로 추출한 본문을 zlib으로 압축해 파일 하나씩 저장합니다.
+DB와 따로 두므로 DB 초기화, 파일 이름 변경/이동, 다른 PC로 옮긴 뒤에도 같은 파일은 다시 파싱하지 않습니다.
+추출 프로세스들이 동시에 써도 되도록 임시 파일에 쓴 뒤 os.replace로 바꿉니다.
+"""
+import os
+import zlib
+
+from src.core import extractors
+
+# DB 파일 옆에 만드는 캐시 폴더 이름
+CACHE_DIRNAME = "extract_cache"
+
+def cache_dir_for(db_path):
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), CACHE_DIRNAME)
+
+def _entry_path(cache_dir, content_hash, ext):
+    return os.path.join(cache_dir, content_hash[:2], f"{content_hash}{ext.lower()}.v{extractors.EXTRACTOR_VERSION}")
+
+def get(cache_dir, content_hash, ext):
+    """
+    캐시된 본문을 돌려줍니다. 없거나 읽을 수 없으면 None.
+    """
+    try:
+        with open(_entry_path(cache_dir, content_hash, ext), "rb") as f:
+            return zlib.decompress(f.read()).decode("utf-8")
+    except (OSError, zlib.error, UnicodeDecodeError):
+        return None
+
+def put(cache_dir, content_hash, ext, content):
+    path = _entry_path(cache_dir, content_hash, ext)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(zlib.compress(content.encode("utf-8")))
+        os.replace(tmp, path)
+    except OSError:
+        # 캐시는 없어도 동작하므로 쓰기 실패(디스크 부족 등)는 무시
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+def _remove(cache_dir, should_remove):
+    removed = 0
+    try:
+        subdirs = list(os.scandir(cache_dir))
+    except OSError:
+        return 0
+    for sub in subdirs:
+        if not sub.is_dir():
+            continue
+        for entry in os.scandir(sub.path):
+            if not should_remove(entry.name):
+                continue
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+def prune(cache_dir, stale_hashes):
+    """
+    stale_hashes(내용 해시)의 항목과 이전 추출기 버전의 항목을 지우고, 지운 개수를 돌려줍니다.
+    다른 폴더의 동기화가 쓰는 중인 임시 파일(.tmp)은 건드리지 않습니다.
+    """
+    suffix = f".v{extractors.EXTRACTOR_VERSION}"
+    return _remove(cache_dir, lambda name: not name.endswith(".tmp") and
+                   (not name.endswith(suffix) or name.split(".", 1)[0] in stale_hashes))
+
+def clear(cache_dir):
+    return _remove(cache_dir, lambda name: True)
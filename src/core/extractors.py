@@ -1,78 +1,78 @@
 import os
 # Lazy imports applied to: zipfile, xml, docx, fitz
 
+# 추출 결과가 달라지도록 고치면 올릴 것 (extract_cache의 이전 결과를 버리고 다시 추출함)
+EXTRACTOR_VERSION = 1
+
 def extract_text_from_pdf(file_path):
-    try:
-        import fitz  # PyMuPDF
-        doc = fitz.open(file_path)
-        full_text = []
+    # 손상된 파일 등에서 난 예외는 그대로 올려 동기화에서 격리되게 함 (빈 설교로 저장하지 않음)
+    import fitz  # PyMuPDF
+    doc = fitz.open(file_path)
+    full_text = []
+    
+    for page in doc:
+        # 단어 단위로 좌표와 함께 추출: (x0, y0, x1, y1, "word", block_no, line_no, word_no)
+        words = page.get_text("words")
+        
+        # Y 좌표를 기준으로 행(Line) 그룹화
+        # y0가 비슷한 것끼리 묶음 (오차 범위 3~5픽셀)
+        lines = {}  # key: representative_y, value: list of words
         
-        for page in doc:
-            # 단어 단위로 좌표와 함께 추출: (x0, y0, x1, y1, "word", block_no, line_no, word_no)
-            words = page.get_text("words")
+        for w in words:
+            y0 = w[1]
+            # 기존 라인 중 y0 차이가 5 이하인 것이 있는지 확인
+            found_line = False
+            for line_y in lines:
+                if abs(line_y - y0) < 5:
+                    lines[line_y].append(w)
+                    found_line = True
+                    break
             
-            # Y 좌표를 기준으로 행(Line) 그룹화
-            # y0가 비슷한 것끼리 묶음 (오차 범위 3~5픽셀)
-            lines = {}  # key: representative_y, value: list of words
+            if not found_line:
+                lines[y0] = [w]
+        
+        # Y 좌표 순으로 라인 정렬 (위에서 아래로)
+        # sorted_lines = sorted(lines.items(), key=lambda item: item[0])
+        sorted_y = sorted(lines.keys())
+        
+        page_text = ""
+        for y in sorted_y:
+            # 라인 내에서 X 좌표 순으로 단어 정렬 (왼쪽에서 오른쪽으로)
+            line_words = sorted(lines[y], key=lambda x: x[0])
             
-            for w in words:
-                y0 = w[1]
-                # 기존 라인 중 y0 차이가 5 이하인 것이 있는지 확인
-                found_line = False
-                for line_y in lines:
-                    if abs(line_y - y0) < 5:
-                        lines[line_y].append(w)
-                        found_line = True
-                        break
+            # 단어들을 이어 붙일 때 간격 확인
+            line_str = ""
+            if not line_words:
+                continue
                 
-                if not found_line:
-                    lines[y0] = [w]
-            
-            # Y 좌표 순으로 라인 정렬 (위에서 아래로)
-            # sorted_lines = sorted(lines.items(), key=lambda item: item[0])
-            sorted_y = sorted(lines.keys())
+            line_str = line_words[0][4]
+            prev_x1 = line_words[0][2]
             
-            page_text = ""
-            for y in sorted_y:
-                # 라인 내에서 X 좌표 순으로 단어 정렬 (왼쪽에서 오른쪽으로)
-                line_words = sorted(lines[y], key=lambda x: x[0])
+            for i in range(1, len(line_words)):
+                curr_word = line_words[i]
+                curr_x0 = curr_word[0]
+                word_text = curr_word[4]
                 
-                # 단어들을 이어 붙일 때 간격 확인
-                line_str = ""
-                if not line_words:
-                    continue
-                    
-                line_str = line_words[0][4]
-                prev_x1 = line_words[0][2]
+                # 두 단어 사이의 간격 계산
+                gap = curr_x0 - prev_x1
                 
-                for i in range(1, len(line_words)):
-                    curr_word = line_words[i]
-                    curr_x0 = curr_word[0]
-                    word_text = curr_word[4]
-                    
-                    # 두 단어 사이의 간격 계산
-                    gap = curr_x0 - prev_x1
-                    
-                    # 간격이 좁으면(예: 3px 미만) 붙이고, 넓으면 띄움
-                    # 문장 부호나 조사가 분리된 경우를 해결하기 위함
-                    if gap < 3.0: 
-                        line_str += word_text
-                    else:
-                        line_str += " " + word_text
-                    
-                    prev_x1 = curr_word[2]
+                # 간격이 좁으면(예: 3px 미만) 붙이고, 넓으면 띄움
+                # 문장 부호나 조사가 분리된 경우를 해결하기 위함
+                if gap < 3.0: 
+                    line_str += word_text
+                else:
+                    line_str += " " + word_text
                 
-                page_text += line_str + "\n"
-            
-            full_text.append(page_text)
+                prev_x1 = curr_word[2]
             
-        # 전체 텍스트 병합 후 최종적으로 줄바꿈 정제 함수 호출
-        # 사용자 정의 정렬로 인해 순서는 맞겠지만, 줄바꿈은 여전히 존재하므로 병합이 필요함.
-        raw_text = "\n".join(full_text)
-        return _merge_broken_lines(raw_text)
-
-    except Exception:
-        return ""
+            page_text += line_str + "\n"
+        
+        full_text.append(page_text)
+        
+    # 전체 텍스트 병합 후 최종적으로 줄바꿈 정제 함수 호출
+    # 사용자 정의 정렬로 인해 순서는 맞겠지만, 줄바꿈은 여전히 존재하므로 병합이 필요함.
+    raw_text = "\n".join(full_text)
+    return _merge_broken_lines(raw_text)
 
 def _merge_broken_lines(text):
     if not text:
@@ -126,11 +126,9 @@ def _merge_broken_lines(text):
     return cleaned_text
 
 def extract_text_from_docx(file_path):
-    try:
-        from docx import Document
-        doc = Document(file_path)
-        return "\n".join([p.text for p in doc.paragraphs])
-    except: return ""
+    from docx import Document
+    doc = Document(file_path)
+    return "\n".join([p.text for p in doc.paragraphs])
 
 def extract_text_from_hwp(file_path):
     """
@@ -139,7 +137,9 @@ def extract_text_from_hwp(file_path):
     우선순위:
     1. hwp5 라이브러리 main() 직접 호출 (In-Process) - 가장 안정적
     2. olefile - PrvText 섹션 (fallback)
+    두 방법 모두 예외로 실패하면 마지막 예외를 올립니다 (손상된 파일이 빈 설교로 저장되지 않도록).
     """
+    error = None
     # 1차 시도: hwp5txt 메인 함수 직접 호출
     try:
         from hwp5.hwp5txt import main as hwp5txt_main
@@ -160,8 +160,8 @@ def extract_text_from_hwp(file_path):
                 if text:
                     return text
                     
-        except Exception:
-            pass
+        except Exception as e:
+            error = e
             
         finally:
             sys.argv = saved_argv
@@ -171,8 +171,8 @@ def extract_text_from_hwp(file_path):
                 
     except ImportError:
         pass
-    except Exception:
-        pass
+    except Exception as e:
+        error = e
 
     # 2차 시도 (fallback): olefile로 PrvText 섹션 추출
     try:
@@ -181,38 +181,38 @@ def extract_text_from_hwp(file_path):
             if ole.exists("PrvText"):
                 encoded_text = ole.openstream("PrvText").read()
                 return encoded_text.decode('utf-16-le', errors='ignore').strip()
-    except Exception:
-        pass
+    except Exception as e:
+        error = e
     
+    if error is not None:
+        raise error
     return ""
 
 def extract_text_from_hwpx(file_path):
     """
     HWPX 파일에서 텍스트를 추출합니다.
+    zip이 아니거나 깨진 파일은 예외를 그대로 올립니다 (섹션 하나가 깨진 경우만 건너뜀).
     """
-    try:
-        import zipfile
-        import xml.etree.ElementTree as ET
+    import zipfile
+    import xml.etree.ElementTree as ET
+    
+    with zipfile.ZipFile(file_path, 'r') as zf:
+        text_parts = []
+        section_files = sorted([
+            name for name in zf.namelist()
+            if name.startswith('Contents/section') and name.endswith('.xml')
+        ])
         
-        with zipfile.ZipFile(file_path, 'r') as zf:
-            text_parts = []
-            section_files = sorted([
-                name for name in zf.namelist()
-                if name.startswith('Contents/section') and name.endswith('.xml')
-            ])
-            
-            for section_file in section_files:
-                try:
-                    with zf.open(section_file) as f:
-                        xml_content = f.read()
-                        root = ET.fromstring(xml_content)
-                        for elem in root.iter():
-                            if elem.tag.endswith('}t') or elem.tag == 't':
-                                if elem.text:
-                                    text_parts.append(elem.text)
-                except Exception:
-                    continue
-            return '\n'.join(text_parts).strip()
-    except Exception:
-        pass
-    return ""
+        for section_file in section_files:
+            try:
+                with zf.open(section_file) as f:
+                    xml_content = f.read()
+                    root = ET.fromstring(xml_content)
+                    for elem in root.iter():
+                        if elem.tag.endswith('}t') or elem.tag == 't':
+                            if elem.text:
+                                text_parts.append(elem.text)
+            except Exception:
+                continue
+        return '\n'.join(text_parts).strip()
+
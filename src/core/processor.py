@@ -1,14 +1,61 @@
 import sqlite3
 import os
-import glob
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import re
+import hashlib
+import threading
+import queue
+import itertools
+from collections import OrderedDict
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 # 새롭게 분리된 모듈 임포트
-from src.core import extractors
+from src.core import db, extractors, scanner, extract_cache, worker_pool
 from src.utils import helpers
 
+# bigram 색인의 단어 단위 (unicode61 토크나이저와 같이 '_'는 구분자로 취급)
+_WORD_RE = re.compile(r"[^\W_]+")
+# 관련도순 정렬에서 제목 일치를 본문 일치보다 무겁게 (search.py의 제목/본문 구분과 같은 취지)
+RANK_TITLE_WEIGHT = 10.0
+# 성경 책 이름 -> 정경 순서 번호 (sermon_refs.book_idx)
+_BOOK_INDEX = {book: i for i, book in enumerate(helpers.BIBLE_ORDER)}
+NO_BOOK = len(helpers.BIBLE_ORDER)
+# 목록/검색 결과에 싣는 열 (본문 제외), root는 설교가 있는 라이브러리 폴더
+_META_COLUMNS = ("s.id, s.file_name, s.title, s.date, s.bible_tags, s.bible_chapter, "
+                 "(SELECT path FROM library_roots r WHERE r.id = s.root_id) AS root")
+# 검색 결과 미리보기: 강조 표시 문자와 길이(trigram 토큰 수 ≒ 글자 수, FTS5 최대 64)
+_HL_START, _HL_END = "\x02", "\x03"
+SNIPPET_TOKENS = 64
+# 검색 결과 캐시 (Streamlit 재실행마다 같은 쿼리를 반복하지 않도록)
+RESULT_CACHE_SIZE = 256
+_result_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_generations = {}
+# 스키마 확인/마이그레이션을 마친 DB (프로세스마다 한 번만 수행)
+_initialized = set()
+# sermons.content 압축 수준 (zlib 1~9). 압축은 동기화 때 한 번, 풀기는 본문을 펼칠 때만
+CONTENT_COMPRESS_LEVEL = 6
+
 def init_db(db_path):
-    conn = sqlite3.connect(db_path, timeout=30)
+    """
+    스키마를 만들고 마이그레이션합니다. 프로세스마다 DB당 한 번만 실제로 수행하므로 매 실행마다 불러도 됩니다.
+    """
+    if db_path in _initialized:
+        return
+    with db.writer(db_path) as conn:
+        packed = _migrate(conn)
+    if packed:
+        # 본문을 압축한 만큼 파일 크기를 줄임 (VACUUM은 트랜잭션 밖에서만 가능)
+        with db.writer(db_path) as conn:
+            conn.execute("VACUUM")
+    _initialized.add(db_path)
+
+def _migrate(conn):
+    """
+    user_version에 따라 스키마를 올립니다. 이번에 압축한 본문 수를 돌려줍니다. (0이 아니면 VACUUM)
+    """
     c = conn.cursor()
+    packed = 0
     c.execute("PRAGMA journal_mode=WAL;")
     c.execute('''
         CREATE TABLE IF NOT EXISTS sermons (
@@ -26,13 +73,403 @@ def init_db(db_path):
         c.execute("ALTER TABLE sermons ADD COLUMN bible_chapter INTEGER DEFAULT 0")
     except:
         pass
-    conn.commit()
-    conn.close()
+    version = c.execute("PRAGMA user_version").fetchone()[0]
+    if version < 2:
+        # 전문 검색 색인 (rowid = sermons.id), 기존 library.db는 1회 백필
+        # - sermons_fts: trigram 토크나이저로 3글자 이상 검색어를 부분 일치로 찾음
+        # - sermons_bigram: 2글자 단어('믿음', '은혜')용 bigram 색인 (본문은 저장하지 않음)
+        c.execute("DROP TABLE IF EXISTS sermons_fts")
+        c.execute("DROP TABLE IF EXISTS sermons_bigram")
+        c.execute("CREATE VIRTUAL TABLE sermons_fts USING fts5(title, content, tokenize='trigram')")
+        c.execute("CREATE VIRTUAL TABLE sermons_bigram USING fts5(title, content, content='')")
+        c.execute("INSERT INTO sermons_fts(rowid, title, content) SELECT id, title, content FROM sermons")
+        rows = conn.execute("SELECT id, title, content FROM sermons")
+        c.executemany("INSERT INTO sermons_bigram(rowid, title, content) VALUES (?, ?, ?)",
+                      ((i, _bigrams(t), _bigrams(b)) for i, t, b in rows))
+        c.execute("PRAGMA user_version = 2")
+    if version < 3:
+        # 성경 본문 위치 (책 필터/통계를 bible_tags LIKE 대신 색인으로 처리)
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS sermon_refs (
+                sermon_id INTEGER NOT NULL,
+                book_idx INTEGER NOT NULL,
+                chapter INTEGER,
+                verse_start INTEGER,
+                verse_end INTEGER
+            )
+        ''')
+        c.execute("CREATE INDEX IF NOT EXISTS idx_sermon_refs_book ON sermon_refs(book_idx, chapter)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_sermon_refs_sermon ON sermon_refs(sermon_id)")
+        rows = conn.execute("SELECT id, title, content FROM sermons")
+        for sermon_id, title, content in rows:
+            _store_refs(c, sermon_id, helpers.extract_bible_refs(content or "", title or ""))
+        c.execute("PRAGMA user_version = 3")
+    if version < 4:
+        # 성경순 정렬용 첫 본문 위치 (책 순서 → 장 → 절), 태그 없는 설교는 맨 뒤(NO_BOOK)
+        for column in (f"bible_book_idx INTEGER DEFAULT {NO_BOOK}", "bible_verse INTEGER DEFAULT 0"):
+            try:
+                c.execute(f"ALTER TABLE sermons ADD COLUMN {column}")
+            except sqlite3.OperationalError:
+                pass
+        c.execute('''
+            UPDATE sermons SET
+                bible_book_idx = COALESCE((SELECT book_idx FROM sermon_refs r WHERE r.sermon_id = sermons.id ORDER BY r.rowid LIMIT 1), ?),
+                bible_verse = COALESCE((SELECT verse_start FROM sermon_refs r WHERE r.sermon_id = sermons.id ORDER BY r.rowid LIMIT 1), 0)
+        ''', (NO_BOOK,))
+        c.execute("CREATE INDEX IF NOT EXISTS idx_sermons_bible_order ON sermons(bible_book_idx, bible_chapter, bible_verse)")
+        c.execute("PRAGMA user_version = 4")
+    if version < 5:
+        # 설교를 파일명이 아닌 대상 폴더 기준 상대 경로로 구분 (하위 폴더의 같은 파일명이 서로 덮어쓰지 않도록)
+        # file_name의 UNIQUE 제약은 ALTER로 없앨 수 없어 테이블을 재구성함. 기존 행은 rel_path가 비어 있고
+        # 다음 동기화에서 파일과 짝지어짐 (sync_files 참고)
+        c.execute(f'''
+            CREATE TABLE sermons_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                rel_path TEXT UNIQUE,
+                file_name TEXT,
+                title TEXT,
+                date TEXT,
+                content TEXT,
+                bible_tags TEXT,
+                bible_chapter INTEGER DEFAULT 0,
+                bible_book_idx INTEGER DEFAULT {NO_BOOK},
+                bible_verse INTEGER DEFAULT 0,
+                last_modified FLOAT
+            )
+        ''')
+        columns = "id, file_name, title, date, content, bible_tags, bible_chapter, bible_book_idx, bible_verse, last_modified"
+        c.execute(f"INSERT INTO sermons_new ({columns}) SELECT {columns} FROM sermons")
+        c.execute("DROP TABLE sermons")
+        c.execute("ALTER TABLE sermons_new RENAME TO sermons")
+        c.execute("CREATE INDEX idx_sermons_bible_order ON sermons(bible_book_idx, bible_chapter, bible_verse)")
+        # 동기화 변경 감지용 파일 목록: 크기/수정 시각이 같으면 건너뛰고, 달라도 내용 해시가 같으면 추출하지 않음
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS file_manifest (
+                rel_path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime FLOAT,
+                content_hash TEXT
+            )
+        ''')
+        c.execute("PRAGMA user_version = 5")
+    if version < 6:
+        # 백그라운드 동기화 작업의 진행 상황/오류 (sync_job 참고, 어느 탭에서든 읽을 수 있도록 DB에 기록)
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS sync_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                target_folder TEXT,
+                status TEXT,
+                started_at FLOAT,
+                finished_at FLOAT,
+                progress FLOAT DEFAULT 0,
+                current_file TEXT,
+                message TEXT
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS sync_errors (
+                job_id INTEGER NOT NULL,
+                rel_path TEXT,
+                error TEXT
+            )
+        ''')
+        c.execute("CREATE INDEX IF NOT EXISTS idx_sync_errors_job ON sync_errors(job_id)")
+        c.execute("PRAGMA user_version = 6")
+    if version < 7:
+        # 추출에 실패했거나 제한 시간/메모리를 넘은 파일. 크기나 수정 시각이 바뀔 때까지 동기화에서 건너뜀
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS quarantine (
+                rel_path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime FLOAT,
+                reason TEXT,
+                detail TEXT,
+                quarantined_at FLOAT
+            )
+        ''')
+        c.execute("PRAGMA user_version = 7")
+    if version < 8:
+        # 추출이 있었던 동기화마다의 기록과 파일별 추출 시간 (설정의 성능 보고서, 형식별 처리량)
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS sync_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT,
+                started_at FLOAT,
+                finished_at FLOAT,
+                seconds FLOAT,
+                extract_mode TEXT,
+                files INTEGER,
+                extracted INTEGER,
+                failed INTEGER
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS extract_timings (
+                run_id INTEGER NOT NULL,
+                rel_path TEXT,
+                format TEXT,
+                bytes INTEGER,
+                chars INTEGER,
+                read_seconds FLOAT,
+                extract_seconds FLOAT,
+                total_seconds FLOAT,
+                cached INTEGER
+            )
+        ''')
+        c.execute("CREATE INDEX IF NOT EXISTS idx_extract_timings_run ON extract_timings(run_id)")
+        c.execute("PRAGMA user_version = 8")
+    if version < 9:
+        # 라이브러리 폴더 여러 개(로컬 디스크, USB, 클라우드 드라이브)를 한 DB에 모음. 설교/manifest/격리 목록을 폴더(root_id)마다 나눔
+        # 기존 행은 1번 폴더로 옮기고, 1번 폴더는 마지막으로 동기화한 폴더로 정함 (기록이 없으면 처음 동기화하는 폴더, _root_id 참고)
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS library_roots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT,
+                path_key TEXT UNIQUE
+            )
+        ''')
+        last = c.execute("SELECT target_folder FROM sync_jobs WHERE target_folder != '' ORDER BY id DESC LIMIT 1").fetchone()
+        if last:
+            c.execute("INSERT OR IGNORE INTO library_roots (id, path, path_key) VALUES (1, ?, ?)",
+                      (os.path.abspath(last[0]), _root_key(last[0])))
+        else:
+            c.execute("INSERT OR IGNORE INTO library_roots (id) VALUES (1)")
+        c.execute(f'''
+            CREATE TABLE sermons_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                root_id INTEGER NOT NULL DEFAULT 1,
+                rel_path TEXT,
+                file_name TEXT,
+                title TEXT,
+                date TEXT,
+                content TEXT,
+                bible_tags TEXT,
+                bible_chapter INTEGER DEFAULT 0,
+                bible_book_idx INTEGER DEFAULT {NO_BOOK},
+                bible_verse INTEGER DEFAULT 0,
+                last_modified FLOAT
+            )
+        ''')
+        columns = "id, rel_path, file_name, title, date, content, bible_tags, bible_chapter, bible_book_idx, bible_verse, last_modified"
+        c.execute(f"INSERT INTO sermons_new ({columns}) SELECT {columns} FROM sermons")
+        c.execute("DROP TABLE sermons")
+        c.execute("ALTER TABLE sermons_new RENAME TO sermons")
+        c.execute("CREATE INDEX idx_sermons_bible_order ON sermons(bible_book_idx, bible_chapter, bible_verse)")
+        c.execute("CREATE UNIQUE INDEX idx_sermons_root_path ON sermons(root_id, rel_path)")
+        for table, columns in (("file_manifest", "size INTEGER, mtime FLOAT, content_hash TEXT"),
+                               ("quarantine", "size INTEGER, mtime FLOAT, reason TEXT, detail TEXT, quarantined_at FLOAT")):
+            c.execute(f"CREATE TABLE {table}_new (root_id INTEGER NOT NULL DEFAULT 1, rel_path TEXT, {columns}, "
+                      "PRIMARY KEY (root_id, rel_path))")
+            names = ", ".join(["rel_path"] + [column.split()[0] for column in columns.split(", ")])
+            c.execute(f"INSERT INTO {table}_new ({names}) SELECT {names} FROM {table}")
+            c.execute(f"DROP TABLE {table}")
+            c.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+        c.execute("PRAGMA user_version = 9")
+    if version < 10:
+        # 본문을 zlib으로 압축해 저장 (DB를 복사/백업하기 쉽게). 압축하지 않은 본문은 검색 색인(sermons_fts)에만 두고
+        # 검색/미리보기/건수는 색인에서, 본문 보기와 내보내기만 풀어서 씀 (_pack/_unpack)
+        last_id = 0
+        while True:
+            rows = conn.execute("SELECT id, content FROM sermons WHERE id > ? AND typeof(content) = 'text' ORDER BY id LIMIT 500",
+                                (last_id,)).fetchall()
+            if not rows:
+                break
+            c.executemany("UPDATE sermons SET content=? WHERE id=?", [(_pack(text), i) for i, text in rows])
+            packed += len(rows)
+            last_id = rows[-1][0]
+        c.execute("PRAGMA user_version = 10")
+    if version < 11:
+        # 본문 위치를 책 순서가 아닌 나온 순서로 찾도록 고쳐서(extract_bible_refs) 대표 본문(첫 위치)을 다시 계산
+        # 압축하지 않은 본문은 색인(sermons_fts)에 있음
+        rows = conn.execute("SELECT rowid, title, content FROM sermons_fts").fetchall()
+        for sermon_id, title, content in rows:
+            refs = helpers.extract_bible_refs(content or "", title or "")
+            book_idx, verse = (_BOOK_INDEX[refs[0][0]], refs[0][2]) if refs else (NO_BOOK, 0)
+            c.execute("UPDATE sermons SET bible_chapter=?, bible_book_idx=?, bible_verse=? WHERE id=?",
+                      (helpers.tags_from_refs(refs)[1], book_idx, verse, sermon_id))
+            _store_refs(c, sermon_id, refs)
+        c.execute("PRAGMA user_version = 11")
+    return packed
+
+def reset_db(db_path):
+    """
+    DB 파일을 지우고 빈 DB를 다시 만듭니다.
+    """
+    db.close_all(db_path)
+    _initialized.discard(db_path)
+    for path in (db_path, db_path + "-wal", db_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    init_db(db_path)
+    bump_generation(db_path)
+
+def bump_generation(db_path):
+    """
+    DB 내용이 바뀌었음을 기록합니다. 이전 세대로 캐시된 검색 결과는 더 이상 쓰이지 않습니다.
+    """
+    with _cache_lock:
+        _generations[db_path] = _generations.get(db_path, 0) + 1
+
+def _cached(kind, db_path, args, compute):
+    """
+    (종류, DB, DB 세대, 인자)를 키로 하는 LRU 캐시. 결과 행은 복사본을 돌려줍니다.
+    """
+    with _cache_lock:
+        key = (kind, db_path, _generations.get(db_path, 0), args)
+        if key in _result_cache:
+            _result_cache.move_to_end(key)
+            return _copy_result(_result_cache[key])
+    result = compute()
+    with _cache_lock:
+        _result_cache[key] = result
+        while len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+    return _copy_result(result)
+
+def _copy_result(result):
+    return [dict(r) for r in result] if isinstance(result, list) else result
+
+def _bigrams(text):
+    """
+    단어마다 겹치는 2글자 조각을 만들어 공백으로 이어 붙입니다. ('하나님께서' -> '하나 나님 님께 께서')
+    """
+    grams = []
+    for word in _WORD_RE.findall(text or ""):
+        if len(word) < 2:
+            grams.append(word)
+        else:
+            grams.extend(word[i:i+2] for i in range(len(word) - 1))
+    return " ".join(grams)
+
+def _pack(text):
+    return zlib.compress((text or "").encode("utf-8"), CONTENT_COMPRESS_LEVEL)
+
+def _unpack(value):
+    # 압축 전 버전의 행(문자열)도 그대로 읽음
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode("utf-8")
+    return value or ""
+
+def _stage_ids(c, ids):
+    """
+    설교 id들을 쓰기 연결의 임시 테이블(temp.sync_ids)에 올립니다. 이후 삭제/색인 갱신을 한 문장씩 집합으로 처리합니다.
+    """
+    c.execute("CREATE TEMP TABLE IF NOT EXISTS sync_ids (id INTEGER PRIMARY KEY)")
+    c.execute("DELETE FROM temp.sync_ids")
+    c.executemany("INSERT OR IGNORE INTO temp.sync_ids (id) VALUES (?)", ((i,) for i in ids))
+
+def _unindex_staged(c):
+    # 본문 없는(contentless) bigram 색인은 색인할 때와 같은 값으로 'delete' 명령을 보내야 지워짐
+    rows = c.connection.execute("SELECT rowid, title, content FROM sermons_fts WHERE rowid IN (SELECT id FROM temp.sync_ids)")
+    c.executemany("INSERT INTO sermons_bigram(sermons_bigram, rowid, title, content) VALUES ('delete', ?, ?, ?)",
+                  ((i, _bigrams(t), _bigrams(b)) for i, t, b in rows))
+    c.execute("DELETE FROM sermons_fts WHERE rowid IN (SELECT id FROM temp.sync_ids)")
+
+def _store_refs(c, sermon_id, refs):
+    """
+    설교 한 편의 성경 본문 위치(extract_bible_refs 결과)를 sermon_refs에 저장합니다.
+    """
+    c.execute("DELETE FROM sermon_refs WHERE sermon_id=?", (sermon_id,))
+    c.executemany("INSERT INTO sermon_refs (sermon_id, book_idx, chapter, verse_start, verse_end) VALUES (?, ?, ?, ?, ?)",
+                  [(sermon_id, _BOOK_INDEX[book], chapter, vs, ve) for book, chapter, vs, ve in refs])
+
+def _delete_staged(c):
+    """
+    temp.sync_ids의 설교와 그 색인, 성경 본문 위치를 함께 지웁니다.
+    """
+    _unindex_staged(c)
+    c.execute("DELETE FROM sermon_refs WHERE sermon_id IN (SELECT id FROM temp.sync_ids)")
+    c.execute("DELETE FROM sermons WHERE id IN (SELECT id FROM temp.sync_ids)")
 
-def _process_single_file(file_path):
-    filename = os.path.basename(file_path)
-    mtime = os.path.getmtime(file_path)
+def _text_match(query):
+    """
+    검색어 길이에 맞는 색인과 MATCH 구문을 고릅니다.
+    색인으로 찾을 수 없는 검색어(1글자, 문장 부호 포함 2글자)는 (None, None)을 반환합니다.
+    """
+    if len(query) >= 3:
+        return "sermons_fts", '"' + query.replace('"', '""') + '"'
+    if len(query) == 2 and _WORD_RE.fullmatch(query):
+        return "sermons_bigram", f'"{query}"'
+    return None, None
+
+def _file_hash(file_path):
+    """
+    파일 내용 해시 (이름/위치가 바뀌어도 같은 내용인지 판단하는 데 사용)
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _try_file_hash(file_path):
+    """
+    변경 확인용 _file_hash. 잠겼거나(한글/워드에서 여는 중) 그새 지워진 파일은 None을 돌려주고,
+    그런 파일은 추출 대상으로 넘겨 추출 실패/격리 처리를 받게 함 (파일 하나 때문에 동기화 전체가 멈추지 않도록)
+    """
+    try:
+        return _file_hash(file_path)
+    except OSError:
+        return None
+
+# 추출 방식: "thread"는 스레드 4개, "process"는 CPU 수만큼 프로세스 (PDF/HWPX 파싱과 성경 태그 정규식은 GIL에 묶임)
+# 프로세스 방식만 파일별 제한 시간/메모리를 넘은 작업자를 강제 종료할 수 있음 (worker_pool 참고)
+EXTRACT_MODES = ("thread", "process")
+# 파일 목록/변경 확인 방식: local은 차례로 훑고 시각만 바뀐 파일은 내용 해시로 확인,
+# cloud는 폴더 읽기/stat을 동시에 하고 폴더 메타데이터(크기, 수정 시각)만으로 판단 (온라인 전용 파일을 내려받지 않도록)
+SCAN_MODES = ("local", "cloud")
+THREAD_WORKERS = 4
+EXTRACT_TIMEOUT = 120
+EXTRACT_MEMORY_MB = 1024
+# 쓰기 스레드가 한 트랜잭션에 넣는 설교 수 / 추출이 느릴 때 모인 만큼 먼저 커밋하는 간격(초)
+# 첫 묶음은 WRITE_FIRST_BATCH개로 작게 시작해 커밋할 때마다 두 배로 늘림 (최근 설교가 곧바로 검색되도록)
+WRITE_BATCH_SIZE = 50
+WRITE_FIRST_BATCH = 5
+WRITE_FLUSH_SECONDS = 1.0
+# 저장을 기다리는 추출 결과(와 동시에 추출 중인 파일)의 최대 개수
+WRITE_QUEUE_SIZE = 64
+# 추출 시간 기록(sync_runs/extract_timings)을 남길 최근 동기화 수
+SYNC_RUNS_KEPT = 20
+_FLUSH = object()
+
+def _make_executor(mode, workers, file_count, timeout, memory_mb):
+    if mode == "process":
+        # 작업자는 필요할 때 띄우므로 파일이 적으면 그만큼만 시작함
+        workers = workers or os.cpu_count() or 1
+        return worker_pool.IsolatedPool(min(workers, file_count), timeout, memory_mb)
+    return ThreadPoolExecutor(max_workers=workers or THREAD_WORKERS)
+
+def _process_single_file(file_path, rel_path, cache_dir=None):
+    """
+    파일 하나에서 본문을 추출하고 성경 구절을 찾습니다.
+    프로세스 풀에서도 실행되므로 호출한 쪽이 이미 아는 값(파일명, 크기, 수정 시각)은 돌려보내지 않습니다.
+    cache_dir가 있으면 같은 내용의 파일을 전에 추출한 결과(extract_cache)를 씁니다.
+    반환: (rel_path, content, refs, content_hash, timing)
+          timing = (파일 읽기(해시) 초, 추출기 초, 전체 초, 캐시 사용 여부)
+    """
+    started = time.perf_counter()
+    content_hash = _file_hash(file_path)
+    read_seconds = time.perf_counter() - started
+    ext = os.path.splitext(file_path)[1]
+    content = extract_cache.get(cache_dir, content_hash, ext) if cache_dir else None
+    cached = content is not None
+    extract_seconds = 0.0
+    if content is None:
+        extract_started = time.perf_counter()
+        content = _extract_text(file_path)
+        extract_seconds = time.perf_counter() - extract_started
+        # 빈 결과는 추출 실패(라이브러리 없음 등)일 수 있어 저장하지 않음
+        if cache_dir and content:
+            extract_cache.put(cache_dir, content_hash, ext, content)
     
+    # 성경 구절은 제목(파일명)에도 달려 있으므로 캐시하지 않고 매번 찾음
+    title = os.path.splitext(os.path.basename(file_path))[0]
+    refs = helpers.extract_bible_refs(content, title)
+    timing = (read_seconds, extract_seconds, time.perf_counter() - started, cached)
+    return (rel_path, content, refs, content_hash, timing)
+
+def _extract_text(file_path):
+    # 추출기 예외(손상된 파일, 인코딩 오류 등)는 잡지 않음 -> _sync에서 실패로 격리됨
     content = ""
     if file_path.lower().endswith(".docx"):
         content = extractors.extract_text_from_docx(file_path)
@@ -43,147 +480,785 @@ def _process_single_file(file_path):
     elif file_path.lower().endswith(".pdf"):
         content = extractors.extract_text_from_pdf(file_path)
     elif file_path.lower().endswith(".txt"):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except:
-            pass
-    
-    sermon_date = helpers.parse_date_from_filename(filename)
-    title = os.path.splitext(filename)[0]
-    bible_tags, bible_chapter = helpers.extract_bible_tags(content, title)
-    
-    return (filename, title, sermon_date, content, bible_tags, bible_chapter, mtime)
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    return content
 
-def sync_files(target_folder, db_path, progress_callback=None, status_callback=None):
-    conn = sqlite3.connect(db_path, timeout=30)
-    c = conn.cursor()
-    c.execute("PRAGMA journal_mode=WAL;")
+def sync_files(target_folder, db_path, progress_callback=None, status_callback=None, skip_folders=(),
+               extract_mode="thread", workers=None, error_callback=None, cancel_event=None,
+               timeout=EXTRACT_TIMEOUT, memory_mb=EXTRACT_MEMORY_MB, dry_run=False, scan_mode="local"):
+    """
+    대상 폴더와 DB를 맞춥니다. 파일은 대상 폴더 기준 상대 경로(file_manifest)로 구분하며,
+    크기와 수정 시각이 그대로인 파일은 읽지도 쓰지도 않고, 시각만 바뀐 파일은 내용 해시로 확인해 다시 추출하지 않습니다.
+    skip_folders: 동기화에서 뺄 하위 폴더 (scanner.scan_files 참고)
+    extract_mode / workers: 추출 방식과 작업자 수 (EXTRACT_MODES, None이면 자동)
+    error_callback(rel_path, 오류): 추출에 실패한 파일마다 호출
+    cancel_event: set되면 새 파일 추출을 멈추고 이미 추출한 것까지만 저장 (다시 동기화하면 나머지부터 이어짐)
+    timeout / memory_mb: 파일 하나의 추출 제한 (프로세스 방식만). 실패하거나 넘은 파일은 quarantine에 올려
+                         파일이 바뀔 때까지 건너뜀
+    dry_run: True면 DB를 바꾸거나 추출하지 않고 _plan의 계획(dict)만 돌려줌
+    scan_mode: SCAN_MODES. cloud면 크기나 수정 시각이 바뀐 파일만 열고 (그대로인 파일은 해시도 구하지 않음),
+               이동은 파일명, 크기, 수정 시각으로 짝지음
+    """
+    scan = scanner.scan_files_parallel if scan_mode == "cloud" else scanner.scan_files
+    scanned = {rel_path: (path, size, mtime) for rel_path, path, size, mtime in scan(target_folder, skip_folders)}
+    if dry_run:
+        return _plan(db_path, _root_id(db_path, target_folder, create=False), scanned, scan_mode)
+    return _sync(db_path, _root_id(db_path, target_folder), scanned, None, progress_callback=progress_callback,
+                 status_callback=status_callback, extract_mode=extract_mode, workers=workers, error_callback=error_callback,
+                 cancel_event=cancel_event, timeout=timeout, memory_mb=memory_mb, scan_mode=scan_mode)
 
-    files = glob.glob(os.path.join(target_folder, "**/*.*"), recursive=True)
-    files = [f for f in files if f.lower().endswith(('.docx', '.hwp', '.hwpx', '.pdf', '.txt'))]
-    
-    current_filenames = set(os.path.basename(f) for f in files)
-    
-    c.execute("SELECT file_name, last_modified FROM sermons")
-    db_cache = {row[0]: row[1] for row in c.fetchall()}
-    db_filenames = set(db_cache.keys())
-    
-    deleted_files = db_filenames - current_filenames
-    deleted_cnt = 0
-    if deleted_files:
-        for filename in deleted_files:
-            c.execute("DELETE FROM sermons WHERE file_name=?", (filename,))
-            deleted_cnt += 1
-        conn.commit()
-    
-    files_to_update = []
-    for file_path in files:
-        filename = os.path.basename(file_path)
-        mtime = os.path.getmtime(file_path)
-        cached_mtime = db_cache.get(filename)
-        if cached_mtime != mtime:
-            files_to_update.append(file_path)
+def sync_paths(target_folder, db_path, rel_paths, skip_folders=(), status_callback=None, **extract_options):
+    """
+    바뀐 경로(파일 또는 폴더, 대상 폴더 기준 상대 경로)만 DB와 맞춥니다. (폴더 감시용)
+    경로 아래에서 없어진 파일은 삭제하고, 새로 생기거나 바뀐 파일만 _process_single_file로 추출합니다.
+    extract_options: sync_files의 extract_mode, workers, timeout, memory_mb, scan_mode
+    """
+    scope = sorted({p.strip("/") for p in rel_paths if p.strip("/")})
+    scanned = {}
+    for rel_path in scope:
+        for rel, path, size, mtime in scanner.scan_path(target_folder, rel_path, skip_folders):
+            scanned[rel] = (path, size, mtime)
+    return _sync(db_path, _root_id(db_path, target_folder), scanned, scope, status_callback=status_callback, **extract_options)
+
+def _root_key(target_folder):
+    # 같은 폴더를 다른 표기(상대 경로, 대소문자)로 넘겨도 한 폴더로 봄
+    return os.path.normcase(os.path.abspath(target_folder))
+
+def _root_id(db_path, target_folder, create=True):
+    """
+    라이브러리 폴더의 id (library_roots). 처음 보는 폴더는 등록하는데, 경로가 정해지지 않은 1번(이전 버전 DB의 설교)이 있으면 이어받습니다.
+    create=False면 등록하지 않고 동기화하면 쓰게 될 id(이어받을 1번 포함)를 돌려주며, 없으면 None. (미리 보기용)
+    """
+    key = _root_key(target_folder)
+    with db.reader(db_path) as conn:
+        row = conn.execute("SELECT id FROM library_roots WHERE path_key=?", (key,)).fetchone()
+        if not row and not create:
+            row = conn.execute("SELECT id FROM library_roots WHERE id=1 AND path_key IS NULL").fetchone()
+    if row or not create:
+        return row[0] if row else None
+    with db.writer(db_path) as conn:
+        row = conn.execute("SELECT id FROM library_roots WHERE path_key=?", (key,)).fetchone()
+        if row:
+            return row[0]
+        if conn.execute("UPDATE library_roots SET path=?, path_key=? WHERE id=1 AND path_key IS NULL",
+                        (os.path.abspath(target_folder), key)).rowcount:
+            return 1
+        return conn.execute("INSERT INTO library_roots (path, path_key) VALUES (?, ?)",
+                            (os.path.abspath(target_folder), key)).lastrowid
+
+def get_roots(db_path):
+    """
+    등록된 라이브러리 폴더와 폴더별 설교 수 [{id, path, sermons}]
+    """
+    with db.reader(db_path) as conn:
+        rows = conn.execute('''
+            SELECT r.id, r.path, (SELECT COUNT(*) FROM sermons s WHERE s.root_id = r.id)
+            FROM library_roots r WHERE r.path IS NOT NULL ORDER BY r.id
+        ''').fetchall()
+    return [{"id": i, "path": path, "sermons": cnt} for i, path, cnt in rows]
+
+def remove_root(db_path, target_folder):
+    """
+    라이브러리 폴더를 빼고 그 폴더의 설교, manifest, 격리 목록을 지웁니다. 지운 설교 수를 돌려줍니다.
+    """
+    # 등록된 폴더만 (_root_id(create=False)는 이어받을 1번도 돌려주는데, 그 설교는 이 폴더의 것이 아님)
+    with db.reader(db_path) as conn:
+        row = conn.execute("SELECT id FROM library_roots WHERE path_key=?", (_root_key(target_folder),)).fetchone()
+    if row is None:
+        return 0
+    root_id = row[0]
+    with db.writer(db_path) as conn:
+        c = conn.cursor()
+        _stage_ids(c, [])
+        c.execute("INSERT INTO temp.sync_ids (id) SELECT id FROM sermons WHERE root_id=?", (root_id,))
+        removed = c.execute("SELECT COUNT(*) FROM temp.sync_ids").fetchone()[0]
+        _delete_staged(c)
+        c.execute("DELETE FROM file_manifest WHERE root_id=?", (root_id,))
+        c.execute("DELETE FROM quarantine WHERE root_id=?", (root_id,))
+        c.execute("DELETE FROM library_roots WHERE id=?", (root_id,))
+    bump_generation(db_path)
+    return removed
+
+def _in_scope(rel_path, scope):
+    return any(rel_path == p or rel_path.startswith(p + "/") for p in scope)
+
+def _sync(db_path, root_id, scanned, scope, progress_callback=None, status_callback=None, extract_mode="thread", workers=None,
+          error_callback=None, cancel_event=None, timeout=EXTRACT_TIMEOUT, memory_mb=EXTRACT_MEMORY_MB, scan_mode="local"):
+    """
+    라이브러리 폴더(root_id)에서 훑은 파일(scanned)과 그 폴더의 file_manifest를 비교해 삭제/갱신합니다.
+    scope가 있으면 그 경로 아래의 manifest만 비교하고, 이전 버전 행(rel_path 없음)과 추출 캐시는 전체 동기화에서만 정리합니다.
+    """
+    cache_dir = extract_cache.cache_dir_for(db_path)
+    # 캐시 정리 대상은 이 폴더가 동기화 전에 쓰던 내용 해시로 한정함 (_prune_cache 참고)
+    old_hashes = _manifest_hashes(db_path, root_id) if scope is None else set()
+    diff = _diff(db_path, root_id, scanned, scope, scan_mode)
+    files_to_update, touched, adopted, deleted_paths, moved, released = (
+        diff[k] for k in ("files_to_update", "touched", "adopted", "deleted_paths", "moved", "released"))
+    skipped = len(diff['skipped'])
+    stale_ids = [sermon_id for sermon_id, _ in diff['stale']]
+    deleted_cnt = len(deleted_paths) + len(stale_ids)
+    if deleted_paths or stale_ids or touched or adopted or released or moved:
+        with db.writer(db_path) as conn:
+            c = conn.cursor()
+            c.executemany("DELETE FROM quarantine WHERE root_id=? AND rel_path=?", [(root_id, p) for p in released])
+            # 없어진 파일 목록을 임시 테이블에 올리고 집합 단위로 삭제 (폴더를 옮기면 수천 개가 한꺼번에 빠짐)
+            c.execute("CREATE TEMP TABLE IF NOT EXISTS sync_gone (rel_path TEXT PRIMARY KEY)")
+            c.execute("DELETE FROM temp.sync_gone")
+            c.executemany("INSERT INTO temp.sync_gone (rel_path) VALUES (?)", ((p,) for p in deleted_paths))
+            _stage_ids(c, stale_ids)
+            c.execute("INSERT OR IGNORE INTO temp.sync_ids (id) SELECT id FROM sermons "
+                      "WHERE root_id=? AND rel_path IN (SELECT rel_path FROM temp.sync_gone)", (root_id,))
+            _delete_staged(c)
+            c.execute("DELETE FROM file_manifest WHERE root_id=? AND rel_path IN (SELECT rel_path FROM temp.sync_gone)", (root_id,))
+            # 옮겨진 파일은 경로만 바꿈 (파일명/내용이 같으므로 색인은 그대로)
+            c.execute("CREATE TEMP TABLE IF NOT EXISTS sync_moves (old_path TEXT PRIMARY KEY, new_path TEXT, size INTEGER, mtime FLOAT)")
+            c.execute("DELETE FROM temp.sync_moves")
+            c.executemany("INSERT INTO temp.sync_moves (old_path, new_path, size, mtime) VALUES (?, ?, ?, ?)", moved)
+            c.execute('''
+                UPDATE sermons SET
+                    rel_path = (SELECT new_path FROM temp.sync_moves m WHERE m.old_path = sermons.rel_path),
+                    last_modified = (SELECT mtime FROM temp.sync_moves m WHERE m.old_path = sermons.rel_path)
+                WHERE root_id = ? AND rel_path IN (SELECT old_path FROM temp.sync_moves)
+            ''', (root_id,))
+            c.execute('''
+                UPDATE file_manifest SET
+                    rel_path = (SELECT new_path FROM temp.sync_moves m WHERE m.old_path = file_manifest.rel_path),
+                    size = (SELECT size FROM temp.sync_moves m WHERE m.old_path = file_manifest.rel_path),
+                    mtime = (SELECT mtime FROM temp.sync_moves m WHERE m.old_path = file_manifest.rel_path)
+                WHERE root_id = ? AND rel_path IN (SELECT old_path FROM temp.sync_moves)
+            ''', (root_id,))
+            c.executemany("UPDATE file_manifest SET size=?, mtime=? WHERE root_id=? AND rel_path=?",
+                          [(size, mtime, root_id, rel_path) for size, mtime, rel_path in touched])
+            c.executemany("UPDATE sermons SET rel_path=? WHERE id=?", [(a[0], a[1]) for a in adopted])
+            c.executemany("INSERT OR REPLACE INTO file_manifest (root_id, rel_path, size, mtime, content_hash) VALUES (?, ?, ?, ?, ?)",
+                          [(root_id, rel_path, size, mtime, content_hash) for rel_path, _, size, mtime, content_hash in adopted])
+        if deleted_cnt > 0 or moved:
+            bump_generation(db_path)
     
-    total = len(files)
+    total = len(scanned)
     update_total = len(files_to_update)
     updated_cnt = 0
     
     if update_total == 0:
-        conn.close()
+        if scope is None and deleted_cnt > 0:
+            _prune_cache(db_path, cache_dir, old_hashes)
         msg = f"총 {total}개 파일 중 {updated_cnt}개 업데이트"
         if deleted_cnt > 0:
             msg += f", {deleted_cnt}개 삭제됨"
+        if moved:
+            msg += f", {len(moved)}개 이동됨"
+        if skipped > 0:
+            msg += f", {skipped}개 격리됨"
         return updated_cnt, msg
     
-    results = []
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        future_to_file = {executor.submit(_process_single_file, f): f for f in files_to_update}
-        for i, future in enumerate(as_completed(future_to_file)):
-            if progress_callback:
-                progress_callback((total - update_total + i + 1) / total)
-            try:
-                result = future.result()
-                results.append(result)
-                if status_callback:
-                    status_callback(f"처리 중: {result[0]}")
-            except Exception:
-                pass
-    
-    for result in results:
-        filename, title, sermon_date, content, bible_tags, bible_chapter, mtime = result
-        c.execute('''
-            INSERT INTO sermons (file_name, title, date, content, bible_tags, bible_chapter, last_modified)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(file_name) DO UPDATE SET
-                title=excluded.title,
-                date=excluded.date,
-                content=excluded.content,
-                bible_tags=excluded.bible_tags,
-                bible_chapter=excluded.bible_chapter,
-                last_modified=excluded.last_modified
-        ''', (filename, title, sermon_date, content, bible_tags, bible_chapter, mtime))
-        updated_cnt += 1
-        if updated_cnt % 50 == 0:
-            conn.commit()
-
-    conn.commit()
-    conn.close()
+    files_to_update = _newest_first(files_to_update, scanned)
+    run_id = _start_run(db_path, "full" if scope is None else "paths", extract_mode, update_total)
+    run_started = time.perf_counter()
+    # 추출(작업자) -> 큐 -> 쓰기 스레드. 큐와 동시에 추출 중인 파일 수를 제한해 본문이 메모리에 쌓이지 않게 함
+    results = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+    written, errors = [0], []
+    failed = []
+    cancelled = False
+    ingest = threading.Thread(target=_ingest, args=(db_path, root_id, results, scanned, written, errors, run_id), daemon=True)
+    ingest.start()
+    try:
+        with _make_executor(extract_mode, workers, update_total, timeout, memory_mb) as executor:
+            todo = iter(files_to_update)
+            pending = {}
+            processed = 0
+            while True:
+                if cancel_event is not None and cancel_event.is_set() and not cancelled:
+                    # 시작 전인 추출만 취소하고, 이미 돌고 있는 파일은 끝나는 대로 저장
+                    cancelled = True
+                    for future in [f for f in pending if f.cancel()]:
+                        del pending[future]
+                if not cancelled:
+                    for file_path, rel_path in itertools.islice(todo, WRITE_QUEUE_SIZE - len(pending)):
+                        pending[executor.submit(_process_single_file, file_path, rel_path, cache_dir)] = (file_path, rel_path)
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                # wait는 set을 돌려주므로 제출 순서(최신 설교 먼저)대로 처리
+                for future in [f for f in pending if f in finished]:
+                    file_path, rel_path = pending.pop(future)
+                    processed += 1
+                    if progress_callback:
+                        progress_callback((total - update_total + processed) / total)
+                    try:
+                        results.put(future.result())
+                        if status_callback:
+                            status_callback(f"처리 중: {os.path.basename(file_path)}")
+                    except Exception as e:
+                        _, size, mtime = scanned[rel_path]
+                        # 프로세스 모드의 예외는 WorkerError로 오므로 작업자 쪽 원래 예외 이름을 씀
+                        reason = getattr(e, "type_name", type(e).__name__)
+                        failed.append((root_id, rel_path, size, mtime, reason, str(e), time.time()))
+                        if error_callback:
+                            error_callback(rel_path, e)
+    finally:
+        results.put(None)
+        ingest.join()
+        with db.writer(db_path) as conn:
+            conn.executemany("INSERT OR REPLACE INTO quarantine (root_id, rel_path, size, mtime, reason, detail, quarantined_at) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?)", failed)
+            conn.execute("UPDATE sync_runs SET finished_at=?, seconds=?, extracted=?, failed=? WHERE id=?",
+                         (time.time(), time.perf_counter() - run_started, written[0], len(failed), run_id))
+    if errors:
+        raise errors[0]
+    updated_cnt = written[0]
+    if scope is None and not cancelled:
+        _prune_cache(db_path, cache_dir, old_hashes)
     
     msg = f"총 {total}개 파일 중 {updated_cnt}개 업데이트"
     if deleted_cnt > 0:
         msg += f", {deleted_cnt}개 삭제됨"
+    if moved:
+        msg += f", {len(moved)}개 이동됨"
+    if skipped + len(failed) > 0:
+        msg += f", {skipped + len(failed)}개 격리됨"
+    if cancelled:
+        msg += f" (중단됨, {update_total - updated_cnt - len(failed)}개 남음)"
     return updated_cnt, msg
 
+def _diff(db_path, root_id, scanned, scope, scan_mode="local"):
+    """
+    훑은 파일(scanned)과 file_manifest를 비교만 합니다. (DB는 바꾸지 않음, 동기화와 계획 미리 보기가 함께 씀)
+    scan_mode가 cloud면 파일을 열지 않음: 시각만 바뀐 파일도 추출 대상(내용이 같으면 추출 캐시에서 바로 나옴)이고,
+    경로를 채운 이전 버전 행은 해시 없이 manifest에 올림
+    files_to_update: 추출할 파일, touched: 시각만 바뀐 파일, adopted: 경로를 채울 이전 버전 행, skipped: 격리로 건너뛸 경로,
+    deleted_paths / moved / released: 없어진 경로, 옮겨진 파일, 격리를 풀 경로, stale: 지울 이전 버전 행 [(id, 파일명)]
+    """
+    with db.reader(db_path) as conn:
+        manifest = {r[0]: r[1:] for r in conn.execute(
+            "SELECT rel_path, size, mtime, content_hash FROM file_manifest WHERE root_id=?", (root_id,))}
+        quarantine = {r[0]: r[1:] for r in conn.execute("SELECT rel_path, size, mtime FROM quarantine WHERE root_id=?", (root_id,))}
+        # 경로 정보가 없는 이전 버전의 행: 파일명과 수정 시각이 맞으면 다시 추출하지 않고 경로만 채움
+        legacy = {}
+        if scope is None:
+            for sermon_id, file_name, last_modified in conn.execute(
+                    "SELECT id, file_name, last_modified FROM sermons WHERE root_id=? AND rel_path IS NULL", (root_id,)):
+                legacy.setdefault(file_name, []).append((sermon_id, last_modified))
+    if scope is not None:
+        manifest = {rel_path: entry for rel_path, entry in manifest.items() if _in_scope(rel_path, scope)}
+        quarantine = {rel_path: entry for rel_path, entry in quarantine.items() if _in_scope(rel_path, scope)}
+    name_counts = {}
+    for path, _, _ in scanned.values():
+        name_counts[os.path.basename(path)] = name_counts.get(os.path.basename(path), 0) + 1
+    
+    files_to_update = []
+    touched = []
+    adopted = []
+    skipped = []
+    for rel_path, (file_path, size, mtime) in scanned.items():
+        entry = manifest.get(rel_path)
+        if entry and entry[0] == size and entry[1] == mtime:
+            continue
+        # 추출에 실패했던 파일은 바뀔 때까지 건너뜀
+        if quarantine.get(rel_path) == (size, mtime):
+            skipped.append(rel_path)
+            continue
+        if entry:
+            content_hash = _try_file_hash(file_path) if scan_mode != "cloud" else None
+            if content_hash is not None and content_hash == entry[2]:
+                touched.append((size, mtime, rel_path))
+                continue
+        else:
+            filename = os.path.basename(file_path)
+            candidates = legacy.get(filename, [])
+            if name_counts[filename] == 1 and len(candidates) == 1 and candidates[0][1] == mtime:
+                # 해시를 못 구하면(잠김 등) 빈 해시로 올림. 다음에 시각이 바뀌면 다시 추출됨
+                content_hash = _try_file_hash(file_path) if scan_mode != "cloud" else None
+                adopted.append((rel_path, candidates.pop()[0], size, mtime, content_hash))
+                continue
+        files_to_update.append((file_path, rel_path))
+    
+    deleted_paths = [rel_path for rel_path in manifest if rel_path not in scanned]
+    moved = _match_moves(files_to_update, deleted_paths, manifest, scanned, by_hash=scan_mode != "cloud")
+    if moved:
+        moved_old = {m[0] for m in moved}
+        moved_new = {m[1] for m in moved}
+        deleted_paths = [rel_path for rel_path in deleted_paths if rel_path not in moved_old]
+        files_to_update = [f for f in files_to_update if f[1] not in moved_new]
+    released = [rel_path for rel_path, entry in quarantine.items()
+                if rel_path not in scanned or scanned[rel_path][1:] != entry]
+    stale = [(sermon_id, file_name) for file_name, rows in legacy.items() for sermon_id, _ in rows]
+    return {"manifest": manifest, "files_to_update": files_to_update, "touched": touched, "adopted": adopted,
+            "skipped": skipped, "deleted_paths": deleted_paths, "moved": moved, "released": released, "stale": stale}
+
+def _plan(db_path, root_id, scanned, scan_mode="local"):
+    """
+    동기화 계획: 형식별 새 파일/바뀐 파일/삭제/그대로/이동/격리 수와, 지난 동기화의 형식별 처리 속도로 잡은 예상 시간(초)
+    기록이 없으면 estimated_seconds는 None이고, 기록이 없는 형식은 전체 평균 속도로 계산합니다. (캐시 적중은 따지지 않으므로 넉넉한 값)
+    """
+    diff = _diff(db_path, root_id, scanned, None, scan_mode)
+    manifest = diff['manifest']
+    kinds = ("new", "changed", "deleted", "unchanged", "moved", "quarantined")
+    by_format = {}
+    
+    def count(rel_path, kind):
+        by_format.setdefault(_file_format(rel_path), dict.fromkeys(kinds, 0))[kind] += 1
+    
+    pending = set()
+    for _, rel_path in diff['files_to_update']:
+        count(rel_path, "changed" if rel_path in manifest else "new")
+        pending.add(rel_path)
+    for _, rel_path, _, _ in diff['moved']:
+        count(rel_path, "moved")
+        pending.add(rel_path)
+    for rel_path in diff['skipped']:
+        count(rel_path, "quarantined")
+        pending.add(rel_path)
+    for rel_path in scanned:
+        if rel_path not in pending:
+            count(rel_path, "unchanged")
+    for rel_path in diff['deleted_paths']:
+        count(rel_path, "deleted")
+    for _, file_name in diff['stale']:
+        count(file_name, "deleted")
+    
+    rates, overall, parallel = _throughput(db_path)
+    estimate = None
+    if overall is not None:
+        estimate = 0.0
+        for _, rel_path in diff['files_to_update']:
+            per_byte, per_file = rates.get(_file_format(rel_path), overall)
+            estimate += scanned[rel_path][1] * per_byte if per_byte else per_file
+        estimate *= parallel
+    return {
+        "total": len(scanned),
+        "extract_files": len(diff['files_to_update']),
+        "extract_bytes": sum(scanned[rel_path][1] for _, rel_path in diff['files_to_update']),
+        "formats": [dict(format=fmt, **counts) for fmt, counts in sorted(by_format.items())],
+        "estimated_seconds": estimate,
+    }
+
+def _newest_first(files_to_update, scanned):
+    """
+    추출 순서: 파일명의 날짜(없으면 수정 시각) 기준 최신 설교부터. 첫 동기화에서도 지난주 설교가 먼저 검색되게 함
+    """
+    def key(item):
+        file_path, rel_path = item
+        mtime = scanned[rel_path][2]
+        sermon_date = helpers.parse_date_from_filename(os.path.basename(file_path))
+        return (sermon_date or time.strftime("%Y-%m-%d", time.localtime(mtime)), mtime)
+    return sorted(files_to_update, key=key, reverse=True)
+
+def _match_moves(files_to_update, deleted_paths, manifest, scanned, by_hash=True):
+    """
+    새 경로 중 사라진 경로와 파일명, 크기, 내용 해시가 모두 같은 것을 이동으로 짝짓습니다. [(이전 경로, 새 경로, 크기, 수정 시각)]
+    해시는 파일명과 크기가 맞는 후보만 계산합니다. by_hash가 False면 해시 대신 수정 시각을 비교합니다. (파일을 열지 않음)
+    """
+    gone = {}
+    for rel_path in deleted_paths:
+        gone.setdefault((os.path.basename(rel_path), manifest[rel_path][0]), []).append(rel_path)
+    moved = []
+    if not gone:
+        return moved
+    for file_path, rel_path in files_to_update:
+        if rel_path in manifest:
+            continue
+        _, size, mtime = scanned[rel_path]
+        candidates = gone.get((os.path.basename(rel_path), size))
+        if not candidates:
+            continue
+        content_hash = _try_file_hash(file_path) if by_hash else None
+        if by_hash and content_hash is None:
+            continue
+        for old_path in candidates:
+            if (manifest[old_path][2] == content_hash) if by_hash else (manifest[old_path][1] == mtime):
+                candidates.remove(old_path)
+                moved.append((old_path, rel_path, size, mtime))
+                break
+    return moved
+
+def _manifest_hashes(db_path, root_id=None):
+    with db.reader(db_path) as conn:
+        if root_id is None:
+            return {r[0] for r in conn.execute("SELECT content_hash FROM file_manifest")}
+        return {r[0] for r in conn.execute("SELECT content_hash FROM file_manifest WHERE root_id=?", (root_id,))}
+
+def _prune_cache(db_path, cache_dir, old_hashes):
+    # 전체 동기화가 끝난 뒤 이 폴더에서 빠진 내용(수정 전 판본, 지운 파일)의 캐시를 정리
+    # 캐시는 모든 폴더가 같이 쓰므로 전체 manifest와 비교하면 DB 초기화 뒤 아직 동기화하지 않은 폴더나
+    # 동시에 처음 동기화 중인 폴더의 캐시까지 지움 -> 동기화 전 이 폴더 manifest에 있던 해시 중 이제 아무 폴더도 쓰지 않는 것만 지움
+    extract_cache.prune(cache_dir, old_hashes - _manifest_hashes(db_path))
+
+def _start_run(db_path, kind, extract_mode, file_count):
+    """
+    동기화 한 번(추출이 있는 경우)의 기록을 만들고 id를 돌려줍니다. 오래된 기록은 종류(kind)마다 SYNC_RUNS_KEPT개만 남김.
+    (폴더 감시의 잦은 "paths" 기록이 전체 동기화 기록을 밀어내지 않도록)
+    """
+    with db.writer(db_path) as conn:
+        run_id = conn.execute("INSERT INTO sync_runs (kind, started_at, extract_mode, files) VALUES (?, ?, ?, ?)",
+                              (kind, time.time(), extract_mode, file_count)).lastrowid
+        old = [(r[0],) for r in conn.execute("SELECT id FROM sync_runs WHERE kind=? ORDER BY id DESC LIMIT -1 OFFSET ?",
+                                             (kind, SYNC_RUNS_KEPT))]
+        conn.executemany("DELETE FROM extract_timings WHERE run_id=?", old)
+        conn.executemany("DELETE FROM sync_runs WHERE id=?", old)
+    return run_id
+
+def _ingest(db_path, root_id, results, scanned, written, errors, run_id):
+    """
+    쓰기 스레드: 큐의 추출 결과를 묶음(WRITE_FIRST_BATCH개부터 WRITE_BATCH_SIZE개까지)마다, 또는 WRITE_FLUSH_SECONDS마다 한 트랜잭션으로 저장합니다.
+    커밋할 때마다 캐시 세대를 올려 동기화 도중에도 저장된 설교가 검색됩니다. None을 받으면 끝냅니다.
+    """
+    batch = []
+    batch_size = min(WRITE_FIRST_BATCH, WRITE_BATCH_SIZE)
+    done = False
+    while not done:
+        try:
+            item = results.get(timeout=WRITE_FLUSH_SECONDS)
+        except queue.Empty:
+            item = _FLUSH
+        if item is None:
+            done = True
+        elif item is not _FLUSH:
+            batch.append(item)
+            if len(batch) < batch_size:
+                continue
+        if not batch:
+            continue
+        # 오류가 난 뒤에도 큐는 계속 비워야 추출 쪽이 put에서 멈추지 않음
+        if not errors:
+            try:
+                with db.writer(db_path) as conn:
+                    _write_batch(conn.cursor(), root_id, batch, scanned, run_id)
+                written[0] += len(batch)
+                bump_generation(db_path)
+                batch_size = min(batch_size * 2, WRITE_BATCH_SIZE)
+            except Exception as e:
+                errors.append(e)
+        batch = []
+
+def _write_batch(c, root_id, batch, scanned, run_id):
+    """
+    추출 결과 묶음을 sermons/file_manifest에 executemany로 넣고 색인과 성경 본문 위치, 추출 시간 기록을 갱신합니다.
+    """
+    rows = []
+    for rel_path, content, refs, content_hash, _ in batch:
+        file_path, size, mtime = scanned[rel_path]
+        filename = os.path.basename(file_path)
+        title = os.path.splitext(filename)[0]
+        bible_tags, bible_chapter = helpers.tags_from_refs(refs)
+        book_idx, verse = (_BOOK_INDEX[refs[0][0]], refs[0][2]) if refs else (NO_BOOK, 0)
+        rows.append((root_id, rel_path, filename, title, helpers.parse_date_from_filename(filename), content,
+                     bible_tags, bible_chapter, book_idx, verse, mtime))
+    # sermons에는 압축한 본문, 색인에는 원문
+    c.executemany('''
+        INSERT INTO sermons (root_id, rel_path, file_name, title, date, content, bible_tags, bible_chapter, bible_book_idx, bible_verse, last_modified)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(root_id, rel_path) DO UPDATE SET
+            file_name=excluded.file_name,
+            title=excluded.title,
+            date=excluded.date,
+            content=excluded.content,
+            bible_tags=excluded.bible_tags,
+            bible_chapter=excluded.bible_chapter,
+            bible_book_idx=excluded.bible_book_idx,
+            bible_verse=excluded.bible_verse,
+            last_modified=excluded.last_modified
+    ''', [row[:5] + (_pack(row[5]),) + row[6:] for row in rows])
+    c.execute(f"SELECT rel_path, id FROM sermons WHERE root_id=? AND rel_path IN ({','.join('?' * len(rows))})",
+              [root_id] + [r[1] for r in rows])
+    ids = dict(c.fetchall())
+    # 다시 추출된 설교의 이전 색인/성경 본문 위치를 묶음째 지우고 새로 넣음
+    _stage_ids(c, ids.values())
+    _unindex_staged(c)
+    c.execute("DELETE FROM sermon_refs WHERE sermon_id IN (SELECT id FROM temp.sync_ids)")
+    c.executemany("INSERT INTO sermons_fts(rowid, title, content) VALUES (?, ?, ?)",
+                  [(ids[row[1]], row[3], row[5]) for row in rows])
+    c.executemany("INSERT INTO sermons_bigram(rowid, title, content) VALUES (?, ?, ?)",
+                  [(ids[row[1]], _bigrams(row[3]), _bigrams(row[5])) for row in rows])
+    c.executemany("INSERT INTO sermon_refs (sermon_id, book_idx, chapter, verse_start, verse_end) VALUES (?, ?, ?, ?, ?)",
+                  [(ids[rel_path], _BOOK_INDEX[book], chapter, vs, ve)
+                   for rel_path, _, refs, _, _ in batch for book, chapter, vs, ve in refs])
+    c.executemany("INSERT OR REPLACE INTO file_manifest (root_id, rel_path, size, mtime, content_hash) VALUES (?, ?, ?, ?, ?)",
+                  [(root_id, rel_path, scanned[rel_path][1], scanned[rel_path][2], content_hash)
+                   for rel_path, _, _, content_hash, _ in batch])
+    c.executemany("INSERT INTO extract_timings (run_id, rel_path, format, bytes, chars, read_seconds, extract_seconds, total_seconds, cached) "
+                  "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                  [(run_id, rel_path, _file_format(rel_path), scanned[rel_path][1], len(content or ""), *timing)
+                   for rel_path, content, _, _, timing in batch])
+
+def _file_format(rel_path):
+    return os.path.splitext(rel_path)[1].lower().lstrip(".")
+
+def get_sync_runs(db_path, limit=None):
+    """
+    추출 시간이 기록된 최근 동기화 목록 (최근 순). 기본은 남아 있는 기록 전부 (종류마다 SYNC_RUNS_KEPT개)
+    """
+    with db.reader(db_path) as conn:
+        c = conn.cursor()
+        c.row_factory = sqlite3.Row
+        c.execute("SELECT * FROM sync_runs ORDER BY id DESC LIMIT ?", (-1 if limit is None else limit,))
+        return [dict(r) for r in c.fetchall()]
+
+def _percentile(values, p):
+    # 최근접 순위 방식, values는 정렬된 목록
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, -(-len(values) * p // 100) - 1))]
+
+def _throughput(db_path):
+    """
+    최근 동기화(종류마다 SYNC_RUNS_KEPT개) 기록의 처리 속도: ({형식: (바이트당 초, 파일당 초)}, 전체 평균, 병렬 배율)
+    속도는 캐시를 쓰지 않은 파일로만 재고, 병렬 배율은 끝난 동기화의 실제 걸린 시간 / 파일별 시간 합입니다.
+    기록이 없으면 전체 평균이 None.
+    """
+    with db.reader(db_path) as conn:
+        rows = conn.execute("SELECT format, COUNT(*), SUM(bytes), SUM(total_seconds) FROM extract_timings "
+                            "WHERE cached = 0 GROUP BY format").fetchall()
+        wall, serial = conn.execute('''
+            SELECT SUM(r.seconds), SUM(t.spent) FROM sync_runs r
+            JOIN (SELECT run_id, SUM(total_seconds) AS spent FROM extract_timings GROUP BY run_id) t ON t.run_id = r.id
+            WHERE r.seconds IS NOT NULL
+        ''').fetchone()
+    
+    def rate(files, size, seconds):
+        return (seconds / size if size else 0.0, seconds / files)
+    
+    rates = {fmt: rate(files, size or 0, seconds or 0.0) for fmt, files, size, seconds in rows}
+    overall = None
+    if rows:
+        overall = rate(sum(r[1] for r in rows), sum(r[2] or 0 for r in rows), sum(r[3] or 0.0 for r in rows))
+    parallel = wall / serial if wall and serial else 1.0
+    return rates, overall, parallel
+
+def get_timing_report(db_path, run_id, slowest=10):
+    """
+    동기화 한 번의 형식별 처리량과 가장 느린 파일을 돌려줍니다.
+    - formats: 형식마다 파일 수, 캐시 사용 수, MB/s, 글자/s, 읽기·추출 시간 합, p50/p95 (캐시를 쓴 파일은 지연 시간 통계에서 제외)
+    - slowest: 전체 시간이 가장 긴 파일
+    """
+    with db.reader(db_path) as conn:
+        c = conn.cursor()
+        c.row_factory = sqlite3.Row
+        c.execute("SELECT * FROM extract_timings WHERE run_id=?", (run_id,))
+        rows = [dict(r) for r in c.fetchall()]
+    by_format = {}
+    for r in rows:
+        by_format.setdefault(r['format'], []).append(r)
+    formats = []
+    for fmt, items in sorted(by_format.items()):
+        parsed = [r for r in items if not r['cached']]
+        seconds = sum(r['total_seconds'] for r in parsed)
+        latencies = sorted(r['total_seconds'] for r in parsed)
+        formats.append({
+            "format": fmt,
+            "files": len(items),
+            "cached": len(items) - len(parsed),
+            "mb_per_s": sum(r['bytes'] for r in parsed) / 1048576 / seconds if seconds else 0.0,
+            "chars_per_s": sum(r['chars'] for r in parsed) / seconds if seconds else 0.0,
+            "read_seconds": sum(r['read_seconds'] for r in parsed),
+            "extract_seconds": sum(r['extract_seconds'] for r in parsed),
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+        })
+    rows.sort(key=lambda r: r['total_seconds'], reverse=True)
+    return {"formats": formats, "slowest": rows[:slowest]}
+
+def get_quarantine(db_path):
+    """
+    격리된 파일 목록 (최근 순, root는 라이브러리 폴더)
+    """
+    with db.reader(db_path) as conn:
+        c = conn.cursor()
+        c.row_factory = sqlite3.Row
+        c.execute("SELECT (SELECT path FROM library_roots r WHERE r.id = q.root_id) AS root, rel_path, reason, detail, quarantined_at "
+                  "FROM quarantine q ORDER BY quarantined_at DESC")
+        return [dict(r) for r in c.fetchall()]
+
+def release_quarantine(db_path, rel_paths=None):
+    """
+    격리를 풀어 다음 동기화에서 다시 추출하게 합니다. rel_paths가 없으면 전부. (rel_paths는 모든 라이브러리 폴더에서 찾음)
+    """
+    with db.writer(db_path) as conn:
+        if rel_paths is None:
+            conn.execute("DELETE FROM quarantine")
+        else:
+            conn.executemany("DELETE FROM quarantine WHERE rel_path=?", [(p,) for p in rel_paths])
+
 def get_stats(db_path):
-    conn = sqlite3.connect(db_path, timeout=30)
-    c = conn.cursor()
-    c.execute("SELECT COUNT(*) FROM sermons")
-    total = c.fetchone()[0]
-    c.execute("SELECT COUNT(*) FROM sermons WHERE bible_tags = ''")
-    no_tag = c.fetchone()[0]
-    c.execute("SELECT bible_tags FROM sermons")
-    rows = c.fetchall()
-    dict_rows = [{'bible_tags': r[0]} for r in rows]
-    conn.close()
-    return total, no_tag, dict_rows
+    with db.reader(db_path) as conn:
+        c = conn.cursor()
+        c.execute("SELECT COUNT(*) FROM sermons")
+        total = c.fetchone()[0]
+        c.execute("SELECT COUNT(*) FROM sermons WHERE bible_tags = ''")
+        no_tag = c.fetchone()[0]
+    return total, no_tag
+
+def get_book_counts(db_path):
+    """
+    성경 책별 설교 수를 반환합니다. {책 이름: 설교 수}
+    """
+    with db.reader(db_path) as conn:
+        rows = conn.execute("SELECT book_idx, COUNT(DISTINCT sermon_id) FROM sermon_refs GROUP BY book_idx").fetchall()
+    return {helpers.BIBLE_ORDER[idx]: cnt for idx, cnt in rows}
 
 def get_all_sermons_metadata(db_path):
-    conn = sqlite3.connect(db_path, timeout=30)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute("SELECT file_name, title, date, bible_tags, content FROM sermons ORDER BY date DESC")
-    rows = [dict(r) for r in c.fetchall()]
-    conn.close()
-    return rows
+    """
+    목록 화면용 메타데이터(본문 제외)를 최신순으로 반환합니다. 본문은 get_sermon_content()로 따로 가져옵니다.
+    """
+    with db.reader(db_path) as conn:
+        c = conn.cursor()
+        c.row_factory = sqlite3.Row
+        c.execute(f"SELECT {_META_COLUMNS} FROM sermons s ORDER BY s.date DESC")
+        return [dict(r) for r in c.fetchall()]
 
-def search_sermons(db_path, query, bible_filter, sort_by_date=True):
-    conn = sqlite3.connect(db_path, timeout=30)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    sql = "SELECT * FROM sermons WHERE 1=1"
+def get_untagged_sermons(db_path, preview_chars=50):
+    """
+    성경 태그가 없는 설교의 메타데이터와 본문 앞부분(preview)을 반환합니다.
+    """
+    with db.reader(db_path) as conn:
+        c = conn.cursor()
+        c.row_factory = sqlite3.Row
+        c.execute(f"SELECT {_META_COLUMNS}, substr(f.content, 1, ?) AS preview, length(f.content) AS content_length "
+                  "FROM sermons s JOIN sermons_fts f ON f.rowid = s.id WHERE s.bible_tags = '' ORDER BY s.date DESC", (preview_chars,))
+        return [dict(r) for r in c.fetchall()]
+
+def get_sermon_content(db_path, sermon_id):
+    """
+    설교 한 편의 본문을 반환합니다. (목록에서 본문을 펼칠 때만 호출, 압축을 풀어 돌려줌)
+    """
+    with db.reader(db_path) as conn:
+        row = conn.execute("SELECT content FROM sermons WHERE id=?", (sermon_id,)).fetchone()
+    return _unpack(row[0]) if row else ""
+
+def export_sermons(db_path, years):
+    """
+    엑셀 내보내기용으로 선택한 연도의 설교를 본문까지 포함해 반환합니다.
+    """
+    marks = ",".join("?" * len(years))
+    with db.reader(db_path) as conn:
+        c = conn.cursor()
+        c.row_factory = sqlite3.Row
+        c.execute(f"SELECT file_name, title, date, bible_tags, content FROM sermons "
+                  f"WHERE substr(date, 1, 4) IN ({marks}) ORDER BY date DESC", list(years))
+        return [dict(r, content=_unpack(r['content'])) for r in c.fetchall()]
+
+def _search_clause(query, bible_filter):
+    """
+    검색 조건의 FROM/WHERE 절을 만듭니다. (sql, params, 사용한 색인 테이블 또는 None)
+    """
     params = []
-    if query:
-        sql += " AND (title LIKE ? OR content LIKE ?)"
+    index, match = _text_match(query) if query else (None, None)
+    if index:
+        sql = f" FROM {index} f JOIN sermons s ON s.id = f.rowid WHERE {index} MATCH ?"
+        params.append(match)
+    elif query:
+        # 색인으로 찾을 수 없는 짧은 검색어는 기존 방식으로 검색 (본문은 색인 테이블의 원문에서)
+        sql = " FROM sermons s JOIN sermons_fts f ON f.rowid = s.id WHERE (s.title LIKE ? OR f.content LIKE ?)"
         params.extend([f"%{query}%", f"%{query}%"])
+    else:
+        sql = " FROM sermons s WHERE 1=1"
     if bible_filter:
-        sub_conditions = []
-        for b in bible_filter:
-            sub_conditions.append("bible_tags LIKE ?")
-            params.append(f"%{b}%")
-        if sub_conditions:
-            sql += " AND (" + " OR ".join(sub_conditions) + ")"
-    if sort_by_date:
-        sql += " ORDER BY date DESC"
-    c.execute(sql, params)
-    rows = [dict(r) for r in c.fetchall()]
-    conn.close()
+        books = [_BOOK_INDEX[b] for b in bible_filter if b in _BOOK_INDEX]
+        marks = ",".join("?" * len(books))
+        sql += f" AND s.id IN (SELECT sermon_id FROM sermon_refs WHERE book_idx IN ({marks}))"
+        params.extend(books)
+    return sql, params, index
+
+def search_sermons(db_path, query, bible_filter, sort="date", limit=None, offset=0):
+    """
+    설교를 검색합니다.
+    sort: "date"(최신순), "rank"(BM25 관련도순, 제목 일치 가중), "bible"(성경 책 순서 → 장 → 절)
+    limit/offset을 주면 해당 페이지의 행만 가져옵니다. 전체 건수는 count_sermons()로 구합니다.
+    결과에는 본문이 없고, 본문은 get_sermon_content()로 가져옵니다.
+    검색어가 있으면 각 행에 미리보기 정보가 붙습니다. (_add_previews 참고)
+    같은 조건의 반복 호출은 DB가 바뀌기 전까지 캐시에서 돌려줍니다.
+    """
+    args = (query, tuple(bible_filter or ()), sort, limit, offset)
+    return _cached("search", db_path, args,
+                   lambda: _search_sermons(db_path, query, bible_filter, sort, limit, offset))
+
+def _search_sermons(db_path, query, bible_filter, sort, limit, offset):
+    where, params, index = _search_clause(query, bible_filter)
+    sql = f"SELECT {_META_COLUMNS}" + where
+    if sort == "rank" and index:
+        # bm25()는 값이 작을수록 관련도가 높음
+        sql += f" ORDER BY bm25({index}, {RANK_TITLE_WEIGHT}, 1.0), s.date DESC"
+    elif sort == "bible":
+        sql += " ORDER BY s.bible_book_idx, s.bible_chapter, s.bible_verse, s.date DESC"
+    else:
+        sql += " ORDER BY s.date DESC"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+    with db.reader(db_path) as conn:
+        c = conn.cursor()
+        c.row_factory = sqlite3.Row
+        c.execute(sql, params)
+        rows = [dict(r) for r in c.fetchall()]
+        if query:
+            _add_previews(c, rows, query, index)
     return rows
 
+def _add_previews(c, rows, query, index):
+    """
+    가져온 행(한 페이지)에만 검색어 정보를 붙입니다. 본문은 DB 밖으로 꺼내지 않습니다.
+    - hits: 본문에 검색어가 나온 횟수
+    - first_hit: 본문에서 처음 나온 위치(글자 단위, 없으면 -1)
+    - snippet: 검색어 주변 본문 일부, highlights: snippet 안의 검색어 위치 [(시작, 끝), ...]
+    """
+    if not rows:
+        return
+    ids = [r['id'] for r in rows]
+    marks = ",".join("?" * len(ids))
+    columns = ("f.rowid AS id, (length(f.content) - length(replace(f.content, ?, ''))) / length(?) AS hits, "
+               "instr(f.content, ?) - 1 AS first_hit")
+    params = [query, query, query]
+    if index == "sermons_fts":
+        # trigram 색인이 직접 만든 미리보기 (대소문자 무시 일치까지 표시)
+        columns += f", snippet(sermons_fts, 1, '{_HL_START}', '{_HL_END}', '…', {SNIPPET_TOKENS}) AS snippet"
+        sql = f"SELECT {columns} FROM sermons_fts f WHERE sermons_fts MATCH ? AND f.rowid IN ({marks})"
+        params.append(_text_match(query)[1])
+    else:
+        # snippet()을 쓸 수 없는 검색어는 첫 등장 위치 주변을 잘라 옴
+        columns += f", substr(f.content, max(instr(f.content, ?) - {SNIPPET_TOKENS // 2}, 1), {SNIPPET_TOKENS * 2}) AS snippet"
+        sql = f"SELECT {columns} FROM sermons_fts f WHERE f.rowid IN ({marks})"
+        params.append(query)
+    c.execute(sql, params + ids)
+    previews = {r['id']: r for r in c.fetchall()}
+    for row in rows:
+        p = previews.get(row['id'])
+        row['hits'] = p['hits'] if p else 0
+        row['first_hit'] = p['first_hit'] if p else -1
+        row['snippet'], row['highlights'] = _parse_snippet(p['snippet'] if p else "", query)
+
+def _parse_snippet(snippet, query):
+    """
+    미리보기 문자열에서 강조 표시를 떼어 내고 강조 위치 목록을 만듭니다.
+    """
+    snippet = snippet or ""
+    if _HL_START not in snippet:
+        spans, start = [], snippet.find(query)
+        while query and start >= 0:
+            spans.append((start, start + len(query)))
+            start = snippet.find(query, start + len(query))
+        return snippet, spans
+    text, spans, pos = "", [], 0
+    for part in re.split(f"({_HL_START}|{_HL_END})", snippet):
+        if part == _HL_START:
+            pos = len(text)
+        elif part == _HL_END:
+            spans.append((pos, len(text)))
+        else:
+            text += part
+    return text, spans
+
+def count_sermons(db_path, query, bible_filter):
+    """
+    search_sermons()와 같은 조건의 전체 결과 건수를 반환합니다.
+    """
+    return _cached("count", db_path, (query, tuple(bible_filter or ())),
+                   lambda: _count_sermons(db_path, query, bible_filter))
+
+def _count_sermons(db_path, query, bible_filter):
+    where, params, _ = _search_clause(query, bible_filter)
+    with db.reader(db_path) as conn:
+        return conn.execute("SELECT COUNT(*)" + where, params).fetchone()[0]
+
 def get_wordcloud_text(db_path):
-    conn = sqlite3.connect(db_path, timeout=30)
-    c = conn.cursor()
-    c.execute("SELECT content FROM sermons")
-    text = " ".join([r[0] for r in c.fetchall()])
-    conn.close()
-    return text
+    with db.reader(db_path) as conn:
+        return " ".join([r[0] for r in conn.execute("SELECT content FROM sermons_fts").fetchall()])
@@ -0,0 +1,113 @@
+"""
+설교 폴더 탐색
+os.scandir로 폴더를 한 번만 훑으면서 확장자로 거르고, DirEntry의 stat 결과(크기, 수정 시각)를 그대로 넘깁니다.
+파일은 열지 않으므로 클라우드 드라이브의 온라인 전용(자리 표시) 파일도 내려받지 않습니다.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# 동기화 대상 확장자
+SUPPORTED_EXTENSIONS = ('.docx', '.hwp', '.hwpx', '.pdf', '.txt')
+# scan_files_parallel: 동시에 폴더를 읽거나 stat하는 작업자 수 / 작업 하나가 stat하는 파일 수
+SCAN_WORKERS = 8
+STAT_BATCH = 64
+
+def _skip_set(skip_folders):
+    return {s.strip().strip("/\\").replace("\\", "/").lower() for s in skip_folders if s and s.strip()}
+
+def scan_files(root, skip_folders=(), extensions=SUPPORTED_EXTENSIONS):
+    """
+    root 아래의 설교 파일을 차례로 돌려줍니다. (상대 경로, 절대 경로, 크기, 수정 시각)
+    - 상대 경로는 '/'로 구분합니다.
+    - skip_folders: 건너뛸 폴더 이름('임시') 또는 root 기준 상대 경로('2010/초안'), 대소문자 무시
+    - 이름이 '.'으로 시작하는 파일/폴더는 glob과 같이 건너뜁니다.
+    """
+    return _walk(root, "", _skip_set(skip_folders), extensions)
+
+def scan_files_parallel(root, skip_folders=(), extensions=SUPPORTED_EXTENSIONS, workers=SCAN_WORKERS):
+    """
+    scan_files와 같은 결과를 폴더 읽기와 stat을 작업자 workers개로 나눠 동시에 구합니다. (돌려주는 순서는 정해지지 않음)
+    클라우드/네트워크 드라이브처럼 폴더 읽기나 stat 한 번이 왕복 지연인 경우용이며, stat은 STAT_BATCH개씩 묶어 작업 수를 줄입니다.
+    """
+    skip = _skip_set(skip_folders)
+    with ThreadPoolExecutor(workers) as executor:
+        pending = {executor.submit(_list_dir, root, "", skip, extensions): "dir"}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if pending.pop(future) == "stat":
+                    yield from future.result()
+                    continue
+                dirs, files = future.result()
+                for folder, prefix in dirs:
+                    pending[executor.submit(_list_dir, folder, prefix, skip, extensions)] = "dir"
+                for i in range(0, len(files), STAT_BATCH):
+                    pending[executor.submit(_stat_entries, files[i:i + STAT_BATCH])] = "stat"
+
+def scan_path(root, rel_path, skip_folders=(), extensions=SUPPORTED_EXTENSIONS):
+    """
+    root 아래의 파일 하나 또는 하위 폴더 하나만 scan_files와 같은 규칙으로 훑습니다. (폴더 감시용)
+    없어졌거나 제외 대상이면 아무것도 돌려주지 않습니다.
+    """
+    skip = _skip_set(skip_folders)
+    parts = rel_path.strip("/").split("/")
+    for i, name in enumerate(parts):
+        if name.startswith("."):
+            return
+        if i < len(parts) - 1 and (name.lower() in skip or "/".join(parts[:i + 1]).lower() in skip):
+            return
+    rel_path = "/".join(parts)
+    path = os.path.join(root, *parts)
+    try:
+        if os.path.isdir(path):
+            if parts[-1].lower() not in skip and rel_path.lower() not in skip:
+                yield from _walk(path, rel_path + "/", skip, extensions)
+        elif parts[-1].lower().endswith(extensions):
+            st = os.stat(path)
+            yield rel_path, path, st.st_size, st.st_mtime
+    except OSError:
+        return
+
+def _walk(root, prefix, skip, extensions):
+    stack = [(root, prefix)]
+    while stack:
+        folder, prefix = stack.pop()
+        dirs, files = _list_dir(folder, prefix, skip, extensions)
+        stack.extend(dirs)
+        yield from _stat_entries(files)
+
+def _list_dir(folder, prefix, skip, extensions):
+    """
+    폴더 하나를 읽어 나눕니다: ([(하위 폴더 경로, 상대 경로 접두어)], [(상대 경로, DirEntry)])
+    """
+    try:
+        with os.scandir(folder) as it:
+            entries = list(it)
+    except OSError:
+        return [], []
+    dirs, files = [], []
+    for entry in entries:
+        if entry.name.startswith("."):
+            continue
+        rel_path = prefix + entry.name
+        try:
+            if entry.is_dir():
+                if entry.name.lower() in skip or rel_path.lower() in skip:
+                    continue
+                dirs.append((entry.path, rel_path + "/"))
+            elif entry.name.lower().endswith(extensions):
+                files.append((rel_path, entry))
+        except OSError:
+            continue
+    return dirs, files
+
+def _stat_entries(files):
+    # Windows는 폴더를 읽을 때 받은 값을 그대로 쓰고, 그 밖의 OS는 파일마다 stat (내용은 읽지 않음)
+    result = []
+    for rel_path, entry in files:
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        result.append((rel_path, entry.path, st.st_size, st.st_mtime))
+    return result
@@ -0,0 +1,125 @@
+"""
+백그라운드 전체 동기화
+sync_files를 별도 스레드에서 돌려 화면이 멈추지 않게 하고, 진행률/현재 파일/오류를 DB(sync_jobs, sync_errors)에 기록합니다.
+어느 탭(세션)에서든 get_status로 읽을 수 있습니다. cancel로 멈춘 뒤 다시 start하면
+이미 저장된 파일은 file_manifest로 건너뛰므로 멈춘 곳부터 이어서 진행됩니다.
+라이브러리 폴더마다 작업이 따로 돌아가므로 느린 네트워크 폴더가 로컬 폴더의 동기화를 막지 않습니다.
+"""
+import os
+import time
+import threading
+
+from src.core import db, processor
+
+# 진행 상황을 DB에 기록하는 최소 간격(초)
+PROGRESS_INTERVAL = 0.5
+# get_status가 돌려주는 최근 오류 수
+MAX_ERRORS_SHOWN = 50
+
+_lock = threading.Lock()
+_jobs = {}  # (db_path, 폴더) -> (스레드, 중단 이벤트)
+
+def _find(db_path, target_folder=None):
+    # target_folder가 없으면 그 DB의 모든 작업
+    with _lock:
+        return [job for (path, folder), job in _jobs.items()
+                if path == db_path and (target_folder is None or folder == target_folder)]
+
+def is_running(db_path, target_folder=None):
+    """
+    target_folder의 동기화가 실행 중인지. target_folder가 없으면 어느 폴더든 실행 중인지.
+    """
+    return any(thread.is_alive() for thread, _ in _find(db_path, target_folder))
+
+def running_folders(db_path):
+    """
+    동기화가 실행 중인 폴더 목록 (시작한 순서)
+    """
+    with _lock:
+        return [folder for (path, folder), (thread, _) in _jobs.items() if path == db_path and thread.is_alive()]
+
+def start(target_folder, db_path, skip_folders=(), **extract_options):
+    """
+    동기화 작업을 시작하고 작업 id를 돌려줍니다. 이 폴더가 이미 실행 중이면 None.
+    extract_options: sync_files의 extract_mode, workers, timeout, memory_mb, scan_mode
+    """
+    with _lock:
+        job = _jobs.get((db_path, target_folder))
+        if job and job[0].is_alive():
+            return None
+        with db.writer(db_path) as conn:
+            # 앱이 꺼지면서 끝나지 못한 작업은 중단으로 표시 (다음 동기화가 이어서 처리)
+            conn.execute("UPDATE sync_jobs SET status='interrupted' WHERE status='running' AND target_folder=?", (target_folder,))
+            job_id = conn.execute("INSERT INTO sync_jobs (target_folder, status, started_at, message) VALUES (?, 'running', ?, ?)",
+                                  (target_folder, time.time(), "파일 목록 확인 중")).lastrowid
+        cancel_event = threading.Event()
+        thread = threading.Thread(target=_run, daemon=True,
+                                  args=(job_id, target_folder, db_path, tuple(skip_folders), extract_options, cancel_event))
+        _jobs[(db_path, target_folder)] = (thread, cancel_event)
+        thread.start()
+        return job_id
+
+def cancel(db_path, target_folder=None):
+    for _, cancel_event in _find(db_path, target_folder):
+        cancel_event.set()
+
+def wait(db_path, timeout=None, target_folder=None):
+    for thread, _ in _find(db_path, target_folder):
+        thread.join(timeout)
+
+def get_status(db_path, target_folder=None):
+    """
+    target_folder(없으면 아무 폴더)의 가장 최근 작업 상태를 dict로 돌려줍니다. (작업이 없으면 None)
+    status: running / done / cancelled / failed / interrupted(앱 종료 등으로 끊김)
+    """
+    where, params = ("WHERE target_folder=?", (target_folder,)) if target_folder is not None else ("", ())
+    with db.reader(db_path) as conn:
+        row = conn.execute("SELECT id, target_folder, status, started_at, finished_at, progress, current_file, message "
+                           f"FROM sync_jobs {where} ORDER BY id DESC LIMIT 1", params).fetchone()
+        if not row:
+            return None
+        keys = ("id", "target_folder", "status", "started_at", "finished_at", "progress", "current_file", "message")
+        status = dict(zip(keys, row))
+        status['error_count'] = conn.execute("SELECT COUNT(*) FROM sync_errors WHERE job_id=?", (status['id'],)).fetchone()[0]
+        status['errors'] = conn.execute("SELECT rel_path, error FROM sync_errors WHERE job_id=? ORDER BY rowid DESC LIMIT ?",
+                                        (status['id'], MAX_ERRORS_SHOWN)).fetchall()
+    if status['status'] == 'running' and not is_running(db_path, status['target_folder']):
+        status['status'] = 'interrupted'
+    return status
+
+def _run(job_id, target_folder, db_path, skip_folders, extract_options, cancel_event):
+    state = {"progress": 0.0, "current_file": "", "saved": 0.0}
+
+    def save():
+        now = time.monotonic()
+        if now - state['saved'] < PROGRESS_INTERVAL:
+            return
+        state['saved'] = now
+        with db.writer(db_path) as conn:
+            conn.execute("UPDATE sync_jobs SET progress=?, current_file=? WHERE id=?",
+                         (state['progress'], state['current_file'], job_id))
+
+    def on_progress(value):
+        state['progress'] = value
+        save()
+
+    def on_status(text):
+        state['current_file'] = text
+        save()
+
+    def on_error(rel_path, error):
+        with db.writer(db_path) as conn:
+            conn.execute("INSERT INTO sync_errors (job_id, rel_path, error) VALUES (?, ?, ?)", (job_id, rel_path, str(error)))
+
+    try:
+        if not os.path.isdir(target_folder):
+            raise FileNotFoundError(f"폴더를 찾을 수 없습니다: {target_folder}")
+        cnt, msg = processor.sync_files(target_folder, db_path, on_progress, on_status, skip_folders,
+                                        error_callback=on_error, cancel_event=cancel_event, **extract_options)
+        status = "cancelled" if cancel_event.is_set() else "done"
+        progress = state['progress'] if cancel_event.is_set() else 1.0
+    except Exception as e:
+        status, msg, progress = "failed", f"동기화 실패: {e}", state['progress']
+    with db.writer(db_path) as conn:
+        conn.execute("UPDATE sync_jobs SET status=?, finished_at=?, progress=?, current_file='', message=? WHERE id=?",
+                     (status, time.time(), progress, msg, job_id))
@@ -0,0 +1,175 @@
+"""
+설교 폴더 감시 (선택 기능, watchdog 필요)
+파일이 생기거나 바뀌거나 옮겨지거나 지워지면 이벤트가 잠잠해질 때까지 기다렸다가(debounce)
+해당 경로만 processor.sync_paths로 다시 맞춥니다. 전체 동기화처럼 폴더 전체를 훑지 않습니다.
+"""
+import os
+import time
+import threading
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # watchdog이 없으면 감시 기능만 꺼짐
+    Observer = None
+    FileSystemEventHandler = object
+
+from src.core import processor
+
+# 마지막 이벤트 후 이만큼 조용하면 반영 (파일 복사/저장 중 여러 번 오는 이벤트를 한 번에 처리)
+DEBOUNCE_SECONDS = 2.0
+# 이벤트가 끊이지 않아도 이 시간이 지나면 모인 만큼 반영
+MAX_DELAY_SECONDS = 30.0
+
+_lock = threading.Lock()
+_watchers = {}  # (db_path, 폴더) -> FolderWatcher
+
+def is_available():
+    return Observer is not None
+
+class _Handler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.event_type not in ("created", "modified", "moved", "deleted"):
+            return
+        # 폴더의 수정 이벤트는 안의 파일 이벤트와 중복이므로 무시 (폴더를 통째로 다시 훑지 않도록)
+        if event.is_directory and event.event_type == "modified":
+            return
+        self.watcher.add(event.src_path)
+        if getattr(event, "dest_path", ""):
+            self.watcher.add(event.dest_path)
+
+class FolderWatcher:
+    """
+    target_folder 하나를 감시합니다. start()/stop()으로 켜고 끄며, 최근 결과는 last_message/last_error에 남습니다.
+    """
+    def __init__(self, target_folder, db_path, skip_folders=(), debounce=DEBOUNCE_SECONDS, extract_options=None):
+        self.target_folder = target_folder
+        self.db_path = db_path
+        self.skip_folders = tuple(skip_folders)
+        self.extract_options = dict(extract_options or {})
+        self.debounce = debounce
+        self.last_message = ""
+        self.last_error = None
+        self._pending = set()
+        self._first_event = None
+        self._last_event = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._observer = None
+        self._thread = None
+
+    def start(self):
+        if Observer is None:
+            raise RuntimeError("watchdog 패키지가 설치되어 있지 않습니다.")
+        self._observer = Observer()
+        self._observer.schedule(_Handler(self), self.target_folder, recursive=True)
+        self._observer.daemon = True
+        self._observer.start()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+        if self._thread:
+            self._thread.join()
+
+    def is_alive(self):
+        return bool(self._observer and self._observer.is_alive() and not self._stopped.is_set())
+
+    def add(self, path):
+        """
+        바뀐 파일/폴더의 절대 경로를 기록합니다.
+        """
+        rel_path = os.path.relpath(path, self.target_folder).replace(os.sep, "/")
+        if rel_path == "." or rel_path.startswith("../"):
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._pending.add(rel_path)
+            self._last_event = now
+            if self._first_event is None:
+                self._first_event = now
+        self._wake.set()
+
+    def flush(self):
+        """
+        모인 경로를 지금 반영합니다. 하위 경로는 상위 폴더에 포함되므로 한 번만 처리합니다.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            self._first_event = self._last_event = None
+        if not pending:
+            return 0
+        paths = sorted(pending)
+        roots = [p for p in paths if not any(p.startswith(q + "/") for q in paths)]
+        try:
+            cnt, self.last_message = processor.sync_paths(self.target_folder, self.db_path, roots, self.skip_folders,
+                                                           **self.extract_options)
+            self.last_error = None
+            return cnt
+        except Exception as e:
+            self.last_error = e
+            return 0
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            while not self._stopped.is_set():
+                with self._lock:
+                    if self._last_event is None:
+                        break
+                    now = time.monotonic()
+                    due = min(self._last_event + self.debounce, self._first_event + MAX_DELAY_SECONDS)
+                if now >= due:
+                    self.flush()
+                    break
+                self._stopped.wait(due - now)
+
+def start(target_folder, db_path, skip_folders=(), **extract_options):
+    """
+    DB의 폴더 감시를 켭니다. Streamlit이 스크립트를 다시 실행할 때마다 불러도 같은 설정이면 그대로 둡니다.
+    extract_options: sync_files의 extract_mode, workers, timeout, memory_mb, scan_mode
+    """
+    with _lock:
+        current = _watchers.get((db_path, target_folder))
+        if current and current.is_alive() and (current.skip_folders, current.extract_options) == \
+                (tuple(skip_folders), extract_options):
+            return current
+        if current:
+            current.stop()
+        watcher = FolderWatcher(target_folder, db_path, skip_folders, extract_options=extract_options)
+        watcher.start()
+        _watchers[(db_path, target_folder)] = watcher
+        return watcher
+
+def start_all(folder_options, db_path, skip_folders=()):
+    """
+    라이브러리 폴더마다 감시를 켜고, 목록에서 빠진 폴더의 감시는 끕니다.
+    folder_options: {폴더: 그 폴더의 sync_paths 옵션(extract_mode, scan_mode 등)}
+    """
+    for folder in {folder for path, folder in list(_watchers) if path == db_path} - set(folder_options):
+        stop(db_path, folder)
+    return [start(folder, db_path, skip_folders, **options) for folder, options in folder_options.items()]
+
+def stop(db_path, target_folder=None):
+    """
+    target_folder의 감시를 끕니다. target_folder가 없으면 그 DB의 모든 폴더.
+    """
+    with _lock:
+        keys = [key for key in _watchers if key[0] == db_path and target_folder in (None, key[1])]
+        watchers = [_watchers.pop(key) for key in keys]
+    for watcher in watchers:
+        watcher.stop()
+
+def get(db_path, target_folder):
+    with _lock:
+        return _watchers.get((db_path, target_folder))
@@ -0,0 +1,235 @@
+"""
+강제 종료할 수 있는 추출 작업자 프로세스 풀
+ProcessPoolExecutor는 멈춘 작업 하나만 끝낼 수 없어서, 작업자마다 프로세스와 파이프를 따로 두고
+관리 스레드가 파일별 제한 시간과 메모리 사용량을 지켜보다가 넘으면 그 작업자만 종료하고 새로 띄웁니다.
+concurrent.futures.Future를 돌려주므로 wait/cancel 등은 ThreadPoolExecutor와 같이 씁니다.
+"""
+import os
+import sys
+import time
+import threading
+import collections
+import multiprocessing
+from multiprocessing.connection import wait as wait_connections
+from concurrent.futures import Future, InvalidStateError
+
+# 관리 스레드가 제한 시간/메모리를 확인하는 간격(초)
+CHECK_INTERVAL = 0.1
+
+class ExtractionTimeout(Exception):
+    pass
+
+class ExtractionMemoryExceeded(Exception):
+    pass
+
+class WorkerCrashed(Exception):
+    pass
+
+class WorkerError(RuntimeError):
+    """
+    작업자 프로세스 안에서 난 예외. 예외 객체는 피클이 안 될 수 있어 이름과 메시지만 받아 옵니다.
+    type_name: 원래 예외 클래스 이름 (예: "ValueError")
+    """
+    def __init__(self, type_name, message):
+        super().__init__(message)
+        self.type_name = type_name
+
+def _worker_main(conn):
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        fn, args = task
+        try:
+            conn.send((True, fn(*args)))
+        except BaseException as e:
+            conn.send((False, (type(e).__name__, str(e))))
+
+def _rss_bytes(pid):
+    """
+    프로세스의 실제 메모리 사용량(바이트). 알 수 없는 OS에서는 None.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return None
+        try:
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+            return None
+        finally:
+            ctypes.windll.kernel32.CloseHandle(handle)
+    return None
+
+def _set_exception(future, error):
+    # 이미 끝났거나 취소된 작업은 그대로 둠
+    if future is None:
+        return
+    try:
+        future.set_exception(error)
+    except InvalidStateError:
+        pass
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.future = None
+        self.started = None
+
+    def run(self, future, fn, args):
+        self.future, self.started = future, time.monotonic()
+        self.conn.send((fn, args))
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+class IsolatedPool:
+    """
+    max_workers개의 작업자 프로세스로 작업을 하나씩 실행합니다.
+    timeout(초)이나 memory_limit_mb를 넘은 작업은 ExtractionTimeout/ExtractionMemoryExceeded로,
+    작업자가 비정상 종료하거나 뜨지 못하면 WorkerCrashed로, 작업 함수가 예외를 내면 WorkerError로 실패합니다.
+    관리 스레드가 예기치 않게 멈추면 남은 작업을 모두 WorkerCrashed로 끝내고, 이후 submit도 WorkerCrashed를 냅니다.
+    """
+    def __init__(self, max_workers, timeout=None, memory_limit_mb=None):
+        self._context = multiprocessing.get_context("spawn")
+        self._max_workers = max_workers
+        self._timeout = timeout
+        self._memory_limit = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+        self._tasks = collections.deque()
+        self._lock = threading.Lock()
+        self._idle = []
+        self._busy = []
+        self._shutdown = False
+        self._broken = None
+        self._manager = threading.Thread(target=self._manage, daemon=True)
+        self._manager.start()
+
+    def submit(self, fn, *args):
+        future = Future()
+        with self._lock:
+            if self._broken is not None:
+                raise WorkerCrashed(f"작업자 풀 관리 스레드가 멈췄습니다: {self._broken}")
+            if self._shutdown:
+                raise RuntimeError("풀이 이미 종료되었습니다.")
+            self._tasks.append((future, fn, args))
+        return future
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            self._shutdown = True
+        if wait:
+            self._manager.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        return False
+
+    def _manage(self):
+        try:
+            while True:
+                self._dispatch()
+                with self._lock:
+                    if self._shutdown and not self._tasks and not self._busy:
+                        break
+                if self._busy:
+                    ready = wait_connections([w.conn for w in self._busy], CHECK_INTERVAL)
+                else:
+                    time.sleep(CHECK_INTERVAL)
+                    ready = []
+                for worker in list(self._busy):
+                    if worker.conn in ready:
+                        self._collect(worker)
+                    else:
+                        self._check_limits(worker)
+        except BaseException as e:
+            # 관리 스레드가 죽으면 아무도 결과를 채우지 않아 기다리는 쪽(_sync의 wait)이 영영 멈추므로
+            # 받아 둔 작업을 모두 실패시키고 더는 받지 않음
+            with self._lock:
+                self._broken = e
+                self._shutdown = True
+                tasks, self._tasks = list(self._tasks), collections.deque()
+            error = WorkerCrashed(f"작업자 풀 관리 스레드가 멈췄습니다: {type(e).__name__}: {e}")
+            for future in [t[0] for t in tasks] + [w.future for w in self._busy]:
+                _set_exception(future, error)
+        finally:
+            for worker in self._idle + self._busy:
+                worker.kill()
+            self._idle, self._busy = [], []
+
+    def _dispatch(self):
+        while True:
+            with self._lock:
+                if not self._tasks or (not self._idle and len(self._busy) >= self._max_workers):
+                    return
+                future, fn, args = self._tasks.popleft()
+            # 이미 취소된 작업은 건너뜀
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                worker = self._idle.pop() if self._idle else _Worker(self._context)
+            except Exception as e:
+                # 프로세스를 띄우지 못함 (파일 핸들/메모리 부족 등). 이 작업만 실패시키고 다음 작업 때 다시 시도
+                _set_exception(future, WorkerCrashed(f"작업자 프로세스를 띄우지 못했습니다: {type(e).__name__}: {e}"))
+                continue
+            self._busy.append(worker)
+            try:
+                worker.run(future, fn, args)
+            except Exception as e:
+                # 파이프 오류나 피클할 수 없는 인자 등
+                self._fail(worker, WorkerCrashed(f"{type(e).__name__}: {e}"))
+
+    def _collect(self, worker):
+        try:
+            ok, value = worker.conn.recv()
+        except (EOFError, OSError):
+            self._fail(worker, WorkerCrashed(f"작업자 프로세스가 비정상 종료했습니다. (코드 {worker.process.exitcode})"))
+            return
+        future, worker.future = worker.future, None
+        self._busy.remove(worker)
+        self._idle.append(worker)
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(WorkerError(*value))
+
+    def _check_limits(self, worker):
+        if self._timeout and time.monotonic() - worker.started > self._timeout:
+            self._fail(worker, ExtractionTimeout(f"{self._timeout:g}초 안에 끝나지 않았습니다."))
+        elif self._memory_limit:
+            rss = _rss_bytes(worker.process.pid)
+            if rss and rss > self._memory_limit:
+                self._fail(worker, ExtractionMemoryExceeded(f"메모리 {rss // (1024 * 1024)}MB 사용 (제한 {self._memory_limit // (1024 * 1024)}MB)"))
+
+    def _fail(self, worker, error):
+        # 작업자를 종료하고 버림 (다음 작업 때 새로 띄움)
+        worker.kill()
+        self._busy.remove(worker)
+        _set_exception(worker.future, error)
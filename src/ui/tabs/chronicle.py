@@ -8,13 +8,12 @@ def render_chronicle(DB_PATH):
     rows = processor.get_all_sermons_metadata(DB_PATH)
     if not rows: st.warning("데이터가 없습니다. 설정에서 동기화를 해주세요.")
     else:
-        df = pd.DataFrame(rows, columns=['file_name','title','date','bible_tags','content'])
-        years = sorted(list(set([d[:4] for d in df['date'] if d])), reverse=True)
+        years = sorted(list(set([r['date'][:4] for r in rows if r['date']])), reverse=True)
         
         with st.expander("📥 엑셀 다운로드"):
             sel_ys = st.multiselect("연도", years)
             if st.button("파일 생성") and sel_ys:
-                out = df[df['date'].str[:4].isin(sel_ys)]
+                out = pd.DataFrame(processor.export_sermons(DB_PATH, sel_ys), columns=['file_name','title','date','bible_tags','content'])
                 b = BytesIO()
                 with pd.ExcelWriter(b, engine='xlsxwriter') as w: out.to_excel(w, index=False)
                 b.seek(0)
@@ -34,6 +33,7 @@ def render_chronicle(DB_PATH):
                             label = f"{r['date']} | {r['title']}  {tags}"
                             with st.expander(label):
                                 st.markdown(f"**{r['title']}**")
-                                st.divider()
-                                for line in r['content'].split('\n'):
-                                    if line.strip(): st.markdown(line)
+                                if st.toggle("📖 본문 보기", key=f"ch_body_{r['id']}"):
+                                    st.divider()
+                                    for line in processor.get_sermon_content(DB_PATH, r['id']).split('\n'):
+                                        if line.strip(): st.markdown(line)
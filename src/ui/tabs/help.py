@@ -107,7 +107,7 @@ def render_help():
         ### 📌 2단계: 폴더 연결 및 동기화
         
         1. 왼쪽 메뉴에서 **[⚙️ 설정]**을 클릭하세요.
-        2. **[📂 폴더 변경하기]** 버튼을 눌러 설교 파일들이 모여있는 폴더를 선택하세요.
+        2. **[📂 폴더 추가]** 버튼을 눌러 설교 파일들이 모여있는 폴더를 선택하세요. (로컬 디스크, USB, 구글 드라이브 등 여러 폴더를 추가할 수 있습니다)
         3. **[🔄 전체 동기화]** 버튼을 누르세요.
         4. 처음 동기화는 파일 수에 따라 몇 분이 걸릴 수 있습니다. ☕ 커피 한 잔 하고 오세요!
         
@@ -173,7 +173,7 @@ def render_help():
         
         | 기능 | 설명 |
         |------|------|
-        | 📂 **폴더 변경** | 설교 파일이 저장된 폴더를 지정합니다. |
+        | 📂 **폴더 추가** | 설교 파일이 저장된 폴더를 추가합니다. 폴더마다 따로 동시에 동기화됩니다. |
         | 🔄 **동기화** | 파일 변경 사항을 DB에 반영합니다. 파일명 변경/삭제 시 자동 정리됩니다. |
         | 🗑️ **DB 초기화** | 데이터베이스를 완전히 리셋합니다. (주의!) |
         | 📏 **화면 높이 조정** | UI 컨테이너의 높이를 조절합니다. |
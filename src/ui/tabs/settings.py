@@ -3,36 +3,201 @@ import os
 import time
 import subprocess
 
-from src.core import processor
+from src.core import processor, watcher, sync_job, extract_cache
 from src.utils import dialogs
 
 def render_settings(config, save_config_func, APP_DATA_DIR, DB_PATH):
     st.title("⚙️ 설정 및 동기화")
-    t1, t2 = st.tabs(["폴더/동기화", "데이터 관리"])
+    t1, t2, t3 = st.tabs(["폴더/동기화", "데이터 관리", "동기화 기록"])
     with t1:
-        cur = config.get("target_folder","")
-        st.info(f"현재 폴더: {cur}")
-        c1, c2 = st.columns(2)
+        roots = library_roots(config)
+        counts = {r['path']: r['sermons'] for r in processor.get_roots(DB_PATH)}
+        st.markdown("**📚 라이브러리 폴더** (폴더마다 따로 동시에 동기화하므로 느린 네트워크 폴더가 다른 폴더를 막지 않음)")
+        if not roots: st.info("폴더를 추가해 주세요.")
+        for i, root in enumerate(roots):
+            r1, r2, r3 = st.columns([4, 1, 1])
+            with r1:
+                st.caption(f"📁 {root} · 설교 {counts.get(os.path.abspath(root), 0)}편"
+                           + ("" if os.path.isdir(root) else " · ⚠️ 연결되지 않음"))
+            with r2:
+                cloud = st.checkbox("☁️ 클라우드", value=root in config.get("cloud_roots", []), key=f"root_cloud_{i}",
+                                    help="구글 드라이브/OneDrive 폴더: 파일을 열지 않고 폴더 정보(크기, 수정 시각)만으로 바뀐 파일을 찾습니다")
+                if cloud != (root in config.get("cloud_roots", [])):
+                    config['cloud_roots'] = [r for r in config.get("cloud_roots", []) if r != root] + ([root] if cloud else [])
+                    save_config_func(config)
+            with r3:
+                if st.button("빼기", key=f"root_remove_{i}", help="이 폴더의 설교를 DB에서 지웁니다", disabled=sync_job.is_running(DB_PATH, root)):
+                    watcher.stop(DB_PATH, root)
+                    processor.remove_root(DB_PATH, root)
+                    _save_roots(config, [r for r in roots if r != root], save_config_func)
+                    st.rerun()
+        skip = st.text_input("🚫 제외할 폴더 (쉼표로 구분, 폴더 이름 또는 상대 경로)", value=", ".join(config.get("skip_folders", [])))
+        skip_list = [s.strip() for s in skip.split(",") if s.strip()]
+        if skip_list != config.get("skip_folders", []):
+            config['skip_folders'] = skip_list
+            save_config_func(config)
+        c1, c2, c3 = st.columns(3)
         with c1:
-            if st.button("📂 폴더 변경"):
+            if st.button("📂 폴더 추가"):
                 p = dialogs.select_folder()
-                if p: 
-                    config['target_folder'] = p
-                    save_config_func(config)
-                    st.success(f"폴더가 변경되었습니다: {p}")
+                if p and p not in roots:
+                    _save_roots(config, roots + [p], save_config_func)
+                    st.success(f"폴더가 추가되었습니다: {p}")
                     time.sleep(0.5); st.rerun()
-                else: st.info("폴더 선택이 취소되었습니다.")
+                elif not p: st.info("폴더 선택이 취소되었습니다.")
         with c2:
-            if st.button("🔄 전체 동기화 (DB 업데이트)", type="primary"):
-                if not cur: st.error("폴더 선택 필요")
+            if st.button("🔄 전체 동기화 (DB 업데이트)", type="primary", disabled=bool(roots) and all(sync_job.is_running(DB_PATH, r) for r in roots)):
+                if not roots: st.error("폴더 선택 필요")
+                else: _start_sync(config, DB_PATH)
+        with c3:
+            if st.button("🔍 동기화 미리 보기"):
+                if not roots: st.error("폴더 선택 필요")
                 else:
-                    bar=st.progress(0); txt=st.empty()
-                    cnt, msg = processor.sync_files(cur, DB_PATH, bar.progress, txt.text)
-                    bar.empty(); txt.empty()
-                    st.success(msg)
+                    with st.spinner("파일 목록 비교 중..."):
+                        st.session_state['sync_plan'] = {
+                            root: processor.sync_files(root, DB_PATH, skip_folders=config.get("skip_folders", []), dry_run=True,
+                                                       scan_mode=sync_options(config, root)['scan_mode'])
+                            for root in roots if os.path.isdir(root)}
+        for root, plan in st.session_state.get('sync_plan', {}).items():
+            if len(roots) > 1: st.markdown(f"**📁 {root}**")
+            render_sync_plan(plan)
+        render_sync_status(config, DB_PATH)
+        st.divider()
+        if not watcher.is_available():
+            st.caption("📡 폴더 자동 감시를 쓰려면 watchdog 패키지가 필요합니다.")
+        else:
+            watch = st.toggle("📡 폴더 자동 감시 (바뀐 파일만 자동 반영)", value=config.get("watch_folder", False))
+            if watch != config.get("watch_folder", False):
+                config['watch_folder'] = watch
+                save_config_func(config)
+                st.rerun()
+            for root in roots if watch else []:
+                w = watcher.get(DB_PATH, root)
+                if not w: continue
+                if w.last_error: st.warning(f"자동 반영 실패 ({root}): {w.last_error}")
+                elif w.last_message: st.caption(f"최근 자동 반영 ({root}): {w.last_message}")
     with t2:
         if st.button("데이터 폴더 열기"): subprocess.Popen(f'explorer "{APP_DATA_DIR}"')
         if st.button("DB 초기화 (삭제)", type="primary"):
-            if os.path.exists(DB_PATH): os.remove(DB_PATH)
-            processor.init_db(DB_PATH)
-            st.success("초기화 완료")
+            if sync_job.is_running(DB_PATH): st.error("동기화 중에는 초기화할 수 없습니다. 먼저 중단해 주세요.")
+            else:
+                processor.reset_db(DB_PATH)
+                st.success("초기화 완료 (추출 캐시는 남아 있어 다시 동기화하면 빠르게 채워집니다)")
+        quarantined = processor.get_quarantine(DB_PATH)
+        if quarantined:
+            with st.expander(f"🚧 격리된 파일 {len(quarantined)}개 (추출 실패/시간 초과, 파일이 바뀔 때까지 건너뜀)"):
+                for q in quarantined: st.caption(f"{os.path.join(q['root'] or '', q['rel_path'])} — {q['reason']}: {q['detail']}")
+                if st.button("모두 다시 시도 (다음 동기화 때)"):
+                    processor.release_quarantine(DB_PATH); st.rerun()
+        if st.button("추출 캐시 비우기"):
+            if sync_job.is_running(DB_PATH): st.error("동기화 중에는 비울 수 없습니다.")
+            else: st.success(f"캐시 {extract_cache.clear(extract_cache.cache_dir_for(DB_PATH))}개를 지웠습니다.")
+    with t3:
+        render_timing_report(DB_PATH)
+
+def render_sync_plan(plan):
+    est = plan['estimated_seconds']
+    est_text = "처리 기록이 없어 예상 시간을 알 수 없습니다" if est is None else f"예상 {int(est // 60)}분 {int(est % 60)}초"
+    st.info(f"전체 {plan['total']}개 중 추출할 파일 {plan['extract_files']}개 ({plan['extract_bytes'] / 1048576:.1f}MB) · {est_text}")
+    st.dataframe([{
+        "형식": f['format'], "새 파일": f['new'], "바뀐 파일": f['changed'], "삭제": f['deleted'],
+        "그대로": f['unchanged'], "이동": f['moved'], "격리": f['quarantined'],
+    } for f in plan['formats']], use_container_width=True, hide_index=True)
+
+def render_timing_report(DB_PATH):
+    runs = processor.get_sync_runs(DB_PATH)
+    if not runs:
+        st.info("아직 기록이 없습니다. 파일을 추출한 동기화부터 형식별 처리 시간이 기록됩니다.")
+        return
+    labels = {f"#{r['id']} {time.strftime('%Y-%m-%d %H:%M', time.localtime(r['started_at']))} · "
+              f"{'전체' if r['kind'] == 'full' else '자동 반영'} · {r['extracted'] or 0}개 / {r['seconds'] or 0:.1f}초": r
+              for r in runs}
+    run = labels[st.selectbox("동기화", list(labels))]
+    report = processor.get_timing_report(DB_PATH, run['id'])
+    st.caption(f"추출 방식: {run['extract_mode']} · 실패/격리 {run['failed'] or 0}개 · "
+               "읽기=파일을 읽어 해시를 구한 시간(네트워크 드라이브면 커짐), 추출=형식별 추출기 시간")
+    st.markdown("**형식별 처리량** (캐시를 쓴 파일은 시간 통계에서 제외)")
+    st.dataframe([{
+        "형식": f['format'], "파일": f['files'], "캐시": f['cached'],
+        "MB/s": round(f['mb_per_s'], 2), "글자/s": int(f['chars_per_s']),
+        "읽기(초)": round(f['read_seconds'], 2), "추출(초)": round(f['extract_seconds'], 2),
+        "p50(초)": round(f['p50'], 3), "p95(초)": round(f['p95'], 3),
+    } for f in report['formats']], use_container_width=True, hide_index=True)
+    st.markdown("**가장 느린 파일**")
+    st.dataframe([{
+        "파일": r['rel_path'], "형식": r['format'], "크기(KB)": r['bytes'] // 1024, "글자": r['chars'],
+        "읽기(초)": round(r['read_seconds'], 3), "추출(초)": round(r['extract_seconds'], 3), "전체(초)": round(r['total_seconds'], 3),
+    } for r in report['slowest']], use_container_width=True, hide_index=True)
+
+def extract_options(config):
+    """
+    config.json의 추출 설정 -> sync_files 인자
+    """
+    return {
+        "extract_mode": config.get("extract_mode", "process"),
+        "workers": config.get("extract_workers") or None,
+        "timeout": config.get("extract_timeout", processor.EXTRACT_TIMEOUT),
+        "memory_mb": config.get("extract_memory_mb", processor.EXTRACT_MEMORY_MB),
+    }
+
+def sync_options(config, root):
+    """
+    라이브러리 폴더 하나의 sync_files 인자 (추출 설정 + 클라우드 폴더면 scan_mode="cloud")
+    """
+    return dict(extract_options(config), scan_mode="cloud" if root in config.get("cloud_roots", []) else "local")
+
+def library_roots(config):
+    """
+    config.json의 라이브러리 폴더 목록 (이전 설정의 target_folder 하나도 목록으로 읽음)
+    """
+    if "library_roots" in config: return list(config["library_roots"])
+    return [config["target_folder"]] if config.get("target_folder") else []
+
+def _save_roots(config, roots, save_config_func):
+    config['library_roots'] = roots
+    config['target_folder'] = roots[0] if roots else ""
+    config['cloud_roots'] = [r for r in config.get("cloud_roots", []) if r in roots]
+    save_config_func(config)
+
+def _start_sync(config, DB_PATH, roots=None):
+    # 폴더마다 작업 하나씩 (이미 실행 중인 폴더는 sync_job.start가 건너뜀)
+    for root in roots or library_roots(config):
+        sync_job.start(root, DB_PATH, config.get("skip_folders", []), **sync_options(config, root))
+
+def _sync_status_body(config, DB_PATH):
+    roots = library_roots(config)
+    for i, root in enumerate(roots):
+        s = sync_job.get_status(DB_PATH, root)
+        if not s: continue
+        if len(roots) > 1: st.markdown(f"**📁 {root}**")
+        if s['status'] == 'running':
+            st.progress(min(s['progress'] or 0.0, 1.0))
+            st.caption(s['current_file'] or s['message'])
+            if st.button("⏹ 동기화 중단", key=f"sync_cancel_{i}"): sync_job.cancel(DB_PATH, root)
+        elif s['status'] == 'done': st.success(s['message'])
+        elif s['status'] == 'failed': st.error(s['message'])
+        else:
+            st.warning(s['message'] if s['status'] == 'cancelled' else f"동기화가 끝나지 못했습니다. ({int((s['progress'] or 0) * 100)}%)")
+            if st.button("▶️ 이어서 동기화", key=f"sync_resume_{i}"): _start_sync(config, DB_PATH, [root]); st.rerun()
+        if s['error_count']:
+            with st.expander(f"⚠️ 추출 실패 {s['error_count']}개"):
+                for rel_path, error in s['errors']: st.caption(f"{rel_path}: {error}")
+
+# 다른 탭으로 옮겨도 동기화는 계속되며, 이 영역만 주기적으로 다시 그려 진행 상황을 보여줌
+if hasattr(st, "fragment"):
+    render_sync_status = st.fragment(run_every=1.0)(_sync_status_body)
+else:
+    render_sync_status = _sync_status_body
+
+def _sync_badge_body(DB_PATH):
+    """
+    사이드바용 짧은 진행 표시 (어느 탭에서든 동기화 진행률을 볼 수 있도록)
+    """
+    # 폴더 없이 get_status를 부르면 가장 최근에 시작한 작업(이미 끝났을 수 있음)이 나오므로 실행 중인 폴더에서 고름
+    folders = sync_job.running_folders(DB_PATH)
+    if not folders: return
+    s = sync_job.get_status(DB_PATH, folders[0])
+    more = f" 외 {len(folders) - 1}개 폴더" if len(folders) > 1 else ""
+    if s: st.caption(f"🔄 동기화 중 {int((s['progress'] or 0) * 100)}% ({os.path.basename(os.path.normpath(s['target_folder']))}){more}")
+
+render_sync_badge = st.fragment(run_every=2.0)(_sync_badge_body) if hasattr(st, "fragment") else _sync_badge_body
@@ -1,7 +1,7 @@
 import streamlit as st
 from src.core import processor
+from src.utils.helpers import BIBLE_ORDER
 
-BIBLE_ORDER = ["창세기","출애굽기","레위기","민수기","신명기","여호수아","사사기","룻기","사무엘상","사무엘하","열왕기상","열왕기하","역대상","역대하","에스라","느헤미야","에스더","욥기","시편","잠언","전도서","아가","이사야","예레미야","예레미야애가","에스겔","다니엘","호세아","요엘","아모스","오바댜","요나","미가","나훔","하박국","스바냐","학개","스가랴","말라기","마태복음","마가복음","누가복음","요한복음","사도행전","로마서","고린도전서","고린도후서","갈라디아서","에베소서","빌립보서","골로새서","데살로니가전서","데살로니가후서","디모데전서","디모데후서","디도서","빌레몬서","히브리서","야고보서","베드로전서","베드로후서","요한1서","요한2서","요한3서","유다서","요한계시록"]
 OT_BOOKS = BIBLE_ORDER[:39]
 NT_BOOKS = BIBLE_ORDER[39:]
 OT_SET = set(OT_BOOKS)
@@ -9,23 +9,10 @@ NT_SET = set(NT_BOOKS)
 
 def render_statistics(DB_PATH):
     st.title("📊 통계 대시보드")
-    total, no_tag, rows = processor.get_stats(DB_PATH)
-    ot_cnt, nt_cnt, cnts = 0, 0, {}
-    
-    for r in rows:
-        tags = r['bible_tags'].split(',')
-        if not r['bible_tags']: continue
-        for t in tags:
-            t = t.strip()
-            if not t: continue
-            book_name = t.split()[0] if ' ' in t else t
-            for b in BIBLE_ORDER:
-                if t.startswith(b):
-                    book_name = b; break
-            if book_name in BIBLE_ORDER:
-                cnts[book_name] = cnts.get(book_name, 0) + 1
-                if book_name in OT_SET: ot_cnt += 1
-                elif book_name in NT_SET: nt_cnt += 1
+    total, no_tag = processor.get_stats(DB_PATH)
+    cnts = processor.get_book_counts(DB_PATH)
+    ot_cnt = sum(cnts.get(b, 0) for b in OT_BOOKS)
+    nt_cnt = sum(cnts.get(b, 0) for b in NT_BOOKS)
 
     c1,c2,c3,c4 = st.columns(4)
     c1.metric("총 설교", f"{total}편"); c2.metric("구약", f"{ot_cnt}회"); c3.metric("신약", f"{nt_cnt}회"); c4.metric("미분류", f"{no_tag}편")
@@ -35,8 +22,7 @@ def render_statistics(DB_PATH):
     if no_tag > 0:
         with st.expander(f"📂 미분류 설교 명단 보기 ({no_tag}편)"):
             st.warning("아래 파일들은 성경 태그가 인식되지 않았습니다. 파일명이나 본문 초반 300자 안에 **'창세기 1:1'** 또는 **'창1장'** 형식으로 성경 본문을 추가해주세요.")
-            all_meta = processor.get_all_sermons_metadata(DB_PATH)
-            no_tag_rows = [row for row in all_meta if not row['bible_tags']]
+            no_tag_rows = processor.get_untagged_sermons(DB_PATH, preview_chars=50)
             if 'stats_page' not in st.session_state: st.session_state['stats_page'] = 0
             PER_PAGE = 30
             total_count = len(no_tag_rows)
@@ -48,8 +34,8 @@ def render_statistics(DB_PATH):
                 if not row['bible_tags']: reasons.append("🚫 성경 태그 없음")
                 if not row['date']: reasons.append("⏳ 날짜 없음")
                 reason_text = " / ".join(reasons) if reasons else ""
-                content_preview = row.get('content', '')[:50].replace('\n', ' ')
-                if len(row.get('content', '')) > 50: content_preview += "..."
+                content_preview = (row['preview'] or '').replace('\n', ' ')
+                if (row['content_length'] or 0) > 50: content_preview += "..."
                 with st.expander(f"**{row['file_name']}** - {reason_text}"):
                     st.caption(f"📄 제목: {row['title']}")
                     if row['date']: st.caption(f"📅 날짜: {row['date']}")
@@ -96,21 +82,23 @@ def render_statistics(DB_PATH):
     def render_sermon_list(selected_book, book_set, testament_name, page_key):
         if selected_book and selected_book in book_set:
             book_count = cnts.get(selected_book, 0)
-            sermons = processor.search_sermons(DB_PATH, "", [selected_book], sort_by_date=True)
+            total_count = processor.count_sermons(DB_PATH, "", [selected_book])
             st.markdown(f"### 📚 {selected_book} ({book_count}편)")
-            if not sermons: st.info("설교가 없습니다.")
+            if total_count == 0: st.info("설교가 없습니다.")
             else:
                 if page_key not in st.session_state: st.session_state[page_key] = 0
-                PER_PAGE = 30; total_count = len(sermons); current_page = st.session_state[page_key]
+                PER_PAGE = 30; current_page = st.session_state[page_key]
                 start_idx = current_page * PER_PAGE; end_idx = start_idx + PER_PAGE
-                page_sermons = sermons[start_idx:end_idx]
+                page_sermons = processor.search_sermons(DB_PATH, "", [selected_book], sort="date", limit=PER_PAGE, offset=start_idx)
                 with st.container(height=550):
                     for s in page_sermons:
                         date_str = s.get('date', '') or '날짜없음'; title = s.get('title', '제목없음')
                         with st.expander(f"{title} ({date_str})"):
-                            preview = s.get('content', '')[:1000].replace('\n', '\n\n')
-                            if len(s.get('content', '')) > 1000: preview += "..."
-                            st.markdown(preview if preview else "_(내용 없음)_")
+                            if st.toggle("📖 본문 미리보기", key=f"{page_key}_body_{s['id']}"):
+                                content = processor.get_sermon_content(DB_PATH, s['id'])
+                                preview = content[:1000].replace('\n', '\n\n')
+                                if len(content) > 1000: preview += "..."
+                                st.markdown(preview if preview else "_(내용 없음)_")
                 if total_count > PER_PAGE:
                     st.divider()
                     c_prev, c_info, c_next = st.columns([1, 2, 1])
@@ -2,8 +2,17 @@ import streamlit as st
 import os
 # processor는 src.core.processor 형식을 따름
 from src.core import processor
+from src.utils.helpers import BIBLE_ORDER
 
-BIBLE_ORDER = ["창세기","출애굽기","레위기","민수기","신명기","여호수아","사사기","룻기","사무엘상","사무엘하","열왕기상","열왕기하","역대상","역대하","에스라","느헤미야","에스더","욥기","시편","잠언","전도서","아가","이사야","예레미야","예레미야애가","에스겔","다니엘","호세아","요엘","아모스","오바댜","요나","미가","나훔","하박국","스바냐","학개","스가랴","말라기","마태복음","마가복음","누가복음","요한복음","사도행전","로마서","고린도전서","고린도후서","갈라디아서","에베소서","빌립보서","골로새서","데살로니가전서","데살로니가후서","디모데전서","디모데후서","디도서","빌레몬서","히브리서","야고보서","베드로전서","베드로후서","요한1서","요한2서","요한3서","유다서","요한계시록"]
+SORT_MODES = {"📅 날짜순": "date", "📖 성경순": "bible", "🎯 관련도순": "rank"}
+
+def highlight_snippet(snippet, highlights):
+    """검색 결과 미리보기의 강조 위치를 빨간 볼드체로 바꿉니다."""
+    out, pos = "", 0
+    for start, end in highlights:
+        out += snippet[pos:start] + f":red[**{snippet[start:end]}**]"
+        pos = end
+    return (out + snippet[pos:]).replace("\n", " ")
 
 def render_workspace(config, DRAFTS_DIR, DB_PATH):
     cl, cr = st.columns([6,4])
@@ -13,10 +22,12 @@ def render_workspace(config, DRAFTS_DIR, DB_PATH):
         with c1: sel_bib = st.multiselect("성경", BIBLE_ORDER)
         with c2: q = st.text_input("검색어", placeholder="제목, 본문, 내용 검색...")
         
-        sort_by_bible = st.toggle("📖 성경 장/절 순으로 정렬", value=False, help="켜면 성경 책 순서 → 장 번호 순으로 정렬됩니다.")
+        sort_label = st.radio("정렬", list(SORT_MODES), horizontal=True, label_visibility="collapsed",
+                              help="관련도순: 제목에 검색어가 있는 설교를 먼저, 본문에 자주 나오는 설교를 다음으로 보여줍니다.")
+        sort_mode = SORT_MODES[sort_label]
         
         if 'search_page' not in st.session_state: st.session_state['search_page'] = 0
-        current_search_hash = f"{q}_{sel_bib}_{sort_by_bible}"
+        current_search_hash = f"{q}_{sel_bib}_{sort_mode}"
         if 'last_search_hash' not in st.session_state: st.session_state['last_search_hash'] = current_search_hash
         
         if st.session_state['last_search_hash'] != current_search_hash:
@@ -25,42 +36,33 @@ def render_workspace(config, DRAFTS_DIR, DB_PATH):
         
         with st.container(height=config.get("ui_height", 650), border=True):
             if q or sel_bib:
-                all_rows = processor.search_sermons(DB_PATH, q, sel_bib, sort_by_date=(not sort_by_bible))
-                
-                if sort_by_bible:
-                    def get_bible_sort_key(row):
-                        tags = row.get('bible_tags', '')
-                        chapter = row.get('bible_chapter', 0) or 0
-                        if not tags: return (len(BIBLE_ORDER), 0)
-                        first_tag = tags.split(',')[0].strip()
-                        for i, book in enumerate(BIBLE_ORDER):
-                            if first_tag == book: return (i, chapter)
-                        return (len(BIBLE_ORDER), 0)
-                    all_rows = sorted(all_rows, key=get_bible_sort_key)
-                
-                total_count = len(all_rows)
+                total_count = processor.count_sermons(DB_PATH, q, sel_bib)
                 PER_PAGE = 30
                 start_idx = st.session_state['search_page'] * PER_PAGE
                 end_idx = start_idx + PER_PAGE
-                page_rows = all_rows[start_idx:end_idx]
                 
-                sort_label = "📖 성경순" if sort_by_bible else "📅 날짜순"
+                page_rows = processor.search_sermons(DB_PATH, q, sel_bib, sort=sort_mode, limit=PER_PAGE, offset=start_idx)
+                
                 st.subheader(f"검색 결과: {total_count}건 ({sort_label})")
-                if not all_rows: st.warning("결과가 없습니다.")
+                if total_count == 0: st.warning("결과가 없습니다.")
                 else:
                     for r in page_rows:
                         title = r['title']
                         date = r['date'] if r['date'] else ""
                         tags = "".join([f"<span class='bible-tag'>{t}</span>" for t in r['bible_tags'].split(',') if t])
-                        cnt_info = f"({r['content'].count(q)}회)" if q else f"({date})"
+                        cnt_info = f"({r['hits']}회)" if q else f"({date})"
                         with st.expander(f"{title} {cnt_info}"):
                             st.markdown(f"<span class='date-badge'>{date}</span> {tags}", unsafe_allow_html=True)
-                            st.divider()
-                            lines = r['content'].split('\n')
-                            for l in lines:
-                                if l.strip():
-                                    if q: st.markdown(l.replace(q, f":red[**{q}**]"))
-                                    else: st.markdown(l)
+                            if r['root']: st.caption(f"📁 {r['root']}")
+                            if q and r['snippet']:
+                                st.caption(highlight_snippet(r['snippet'], r['highlights']))
+                            # 본문은 펼쳐 볼 때만 DB에서 가져와 한 번에 그림
+                            if st.toggle("📖 본문 보기", key=f"ws_body_{r['id']}"):
+                                st.divider()
+                                lines = processor.get_sermon_content(DB_PATH, r['id']).split('\n')
+                                body = "\n\n".join(l for l in lines if l.strip())
+                                if q: body = body.replace(q, f":red[**{q}**]")
+                                st.markdown(body)
                     st.divider()
                     col_prev, col_info, col_next = st.columns([1, 2, 1])
                     with col_prev:
@@ -27,10 +27,40 @@ def parse_date_from_filename(filename):
                 continue
     return ""
 
+# 성경 66권 (정경 순서)
+BIBLE_ORDER = ["창세기","출애굽기","레위기","민수기","신명기","여호수아","사사기","룻기",
+               "사무엘상","사무엘하","열왕기상","열왕기하","역대상","역대하","에스라","느헤미야",
+               "에스더","욥기","시편","잠언","전도서","아가","이사야","예레미야","예레미야애가",
+               "에스겔","다니엘","호세아","요엘","아모스","오바댜","요나","미가","나훔","하박국",
+               "스바냐","학개","스가랴","말라기","마태복음","마가복음","누가복음","요한복음",
+               "사도행전","로마서","고린도전서","고린도후서","갈라디아서","에베소서","빌립보서",
+               "골로새서","데살로니가전서","데살로니가후서","디모데전서","디모데후서","디도서",
+               "빌레몬서","히브리서","야고보서","베드로전서","베드로후서","요한1서","요한2서",
+               "요한3서","유다서","요한계시록"]
+
+# 장 번호 뒤의 절 범위: '3:16', '3:16-18', '3장 16절', '3장 16~18절'
+_VERSE_PATTERN = r"(?:\s*(?::|장\s*)\s*(\d+)\s*절?(?:\s*[-~]\s*(\d+))?)?"
+
 def extract_bible_tags(text, title):
     """
     제목과 본문 초반에서 성경 본문 태그를 추출합니다.
     """
+    return tags_from_refs(extract_bible_refs(text, title))
+
+def tags_from_refs(refs):
+    """
+    extract_bible_refs() 결과를 (쉼표로 이은 책 이름, 첫 본문의 장)으로 요약합니다.
+    """
+    first_chapter = refs[0][1] if refs else 0
+    tags = ",".join(sorted(set(r[0] for r in refs)))
+    return tags, first_chapter
+
+def extract_bible_refs(text, title):
+    """
+    제목과 본문 초반에서 성경 본문 위치를 추출합니다. 글에 나온 순서(제목 먼저, 그다음 본문)로 돌려주므로
+    첫 항목이 설교의 대표 본문입니다 (성경순 정렬, bible_chapter).
+    반환: [(책 이름, 장, 시작 절, 끝 절), ...] (절이 없으면 0, 책마다 첫 위치 하나)
+    """
     short_to_full = {
         "창세기": "창세기", "출애굽기": "출애굽기", "레위기": "레위기", "민수기": "민수기", "신명기": "신명기",
         "삼상": "사무엘상", "삼하": "사무엘하", "왕상": "열왕기상", "왕하": "열왕기하",
@@ -53,47 +83,36 @@ def extract_bible_tags(text, title):
         "히": "히브리서", "야": "야고보서", "유": "유다서", "계": "요한계시록",
     }
     
-    full_names = ["창세기","출애굽기","레위기","민수기","신명기","여호수아","사사기","룻기",
-                  "사무엘상","사무엘하","열왕기상","열왕기하","역대상","역대하","에스라","느헤미야",
-                  "에스더","욥기","시편","잠언","전도서","아가","이사야","예레미야","예레미야애가",
-                  "에스겔","다니엘","호세아","요엘","아모스","오바댜","요나","미가","나훔","하박국",
-                  "스바냐","학개","스가랴","말라기","마태복음","마가복음","누가복음","요한복음",
-                  "사도행전","로마서","고린도전서","고린도후서","갈라디아서","에베소서","빌립보서",
-                  "골로새서","데살로니가전서","데살로니가후서","디모데전서","디모데후서","디도서",
-                  "빌레몬서","히브리서","야고보서","베드로전서","베드로후서","요한1서","요한2서",
-                  "요한3서","유다서","요한계시록"]
-    
     combined = title + " " + text[:150]
     found = []
-    first_chapter = 0
     
-    for full in full_names:
-        pattern = rf"{re.escape(full)}\s*(\d+)"
+    def add(full, match):
+        chapter = int(match.group(1))
+        verse_start = int(match.group(2)) if match.group(2) else 0
+        verse_end = int(match.group(3)) if match.group(3) else verse_start
+        found.append((match.start(1), (full, chapter, verse_start, verse_end)))
+    
+    for full in BIBLE_ORDER:
+        pattern = rf"{re.escape(full)}\s*(\d+)" + _VERSE_PATTERN
         match = re.search(pattern, combined)
         if match:
-            chapter = int(match.group(1))
-            found.append((full, chapter))
+            add(full, match)
     
     for short, full in short_to_full.items():
-        if full in [f[0] for f in found]:
+        if full in [f[1][0] for f in found]:
             continue
-        pattern = rf"{re.escape(short)}\s*(\d+)"
+        pattern = rf"{re.escape(short)}\s*(\d+)" + _VERSE_PATTERN
         match = re.search(pattern, combined)
         if match:
-            chapter = int(match.group(1))
-            found.append((full, chapter))
+            add(full, match)
     
     for short, full in single_char_short.items():
-        if full in [f[0] for f in found]:
+        if full in [f[1][0] for f in found]:
             continue
-        pattern = rf"(?:^|[\s:;,.()\[\]「」『』]){re.escape(short)}\s*(\d+)"
+        pattern = rf"(?:^|[\s:;,.()\[\]「」『』]){re.escape(short)}\s*(\d+)" + _VERSE_PATTERN
         match = re.search(pattern, combined)
         if match:
-            chapter = int(match.group(1))
-            found.append((full, chapter))
-    
-    if found:
-        first_chapter = found[0][1]
+            add(full, match)
     
-    tags = ",".join(sorted(set(f[0] for f in found)))
-    return tags, first_chapter
+    # 책 순서대로 찾았으므로 나온 위치순으로 정렬 (combined가 제목 + 본문이라 제목의 본문이 먼저)
+    return [ref for _, ref in sorted(found, key=lambda f: f[0])]
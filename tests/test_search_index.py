@@ -0,0 +1,228 @@
+"""
+검색 색인(FTS5) 테스트
+임시 폴더의 txt 설교로 동기화한 뒤 processor.search_sermons 결과를 검증합니다.
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import processor
+
+SAMPLES = {
+    "2024-01-07 창세기 1장 태초에.txt": "창세기 1:1 태초에 하나님께서 천지를 창조하시니라.\n믿음으로 사는 삶",
+    "2024-02-04 요한복음 3장.txt": "요한복음 3:16 하나님이 세상을 이처럼 사랑하사\n영생을 얻게 하려 하심이라",
+    "2024-03-03 로마서 1장.txt": "롬 1:17 의인은 믿음으로 말미암아 살리라",
+}
+
+def _write_samples(folder, samples):
+    for name, text in samples.items():
+        with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+def _synced_library(tmp):
+    folder = os.path.join(tmp, "sermons")
+    os.makedirs(folder)
+    _write_samples(folder, SAMPLES)
+    db_path = os.path.join(tmp, "library.db")
+    processor.init_db(db_path)
+    processor.sync_files(folder, db_path)
+    return folder, db_path
+
+def test_search_uses_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _synced_library(tmp)
+        titles = [r['title'] for r in processor.search_sermons(db_path, "하나님", [])]
+        assert len(titles) == 2
+        titles = [r['title'] for r in processor.search_sermons(db_path, "믿음", [])]
+        assert sorted(titles) == ["2024-01-07 창세기 1장 태초에", "2024-03-03 로마서 1장"]
+        assert processor.search_sermons(db_path, "없는단어", []) == []
+
+def test_korean_substring_match():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _synced_library(tmp)
+        # 조사가 붙은 단어 안쪽도 LIKE 검색처럼 찾아야 함
+        assert len(processor.search_sermons(db_path, "님께서", [])) == 1   # trigram
+        assert len(processor.search_sermons(db_path, "나님", [])) == 2     # bigram
+        assert len(processor.search_sermons(db_path, "음으", [])) == 2     # bigram ('믿음으로')
+        assert len(processor.search_sermons(db_path, "이처럼 사랑", [])) == 1
+        assert len(processor.search_sermons(db_path, "삶", [])) == 1       # 1글자는 기존 방식
+
+def test_rank_prefers_title_hits():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _synced_library(tmp)
+        _write_samples(folder, {"2023-12-31 사랑의 계명.txt": "서로 사랑하라"})
+        processor.sync_files(folder, db_path)
+        # 날짜순이면 본문에만 있는 최신 설교가 먼저, 관련도순이면 제목 일치가 먼저
+        rows = processor.search_sermons(db_path, "사랑", [], sort="date")
+        assert rows[0]['title'] == "2024-02-04 요한복음 3장"
+        rows = processor.search_sermons(db_path, "사랑", [], sort="rank")
+        assert rows[0]['title'] == "2023-12-31 사랑의 계명"
+        rows = processor.search_sermons(db_path, "세상을 이처럼", [], sort="rank")
+        assert [r['title'] for r in rows] == ["2024-02-04 요한복음 3장"]
+
+def test_pagination():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _synced_library(tmp)
+        everything = processor.search_sermons(db_path, "", ["창세기", "요한복음", "로마서"])
+        assert processor.count_sermons(db_path, "", ["창세기", "요한복음", "로마서"]) == 3
+        page1 = processor.search_sermons(db_path, "", ["창세기", "요한복음", "로마서"], limit=2, offset=0)
+        page2 = processor.search_sermons(db_path, "", ["창세기", "요한복음", "로마서"], limit=2, offset=2)
+        assert page1 + page2 == everything
+        assert processor.count_sermons(db_path, "하나님", []) == 2
+
+def test_results_without_content():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _synced_library(tmp)
+        rows = processor.search_sermons(db_path, "믿음으로", [])
+        assert all('content' not in r for r in rows)
+        assert [r['hits'] for r in rows] == [1, 1]
+        body = processor.get_sermon_content(db_path, rows[0]['id'])
+        assert "믿음으로" in body
+        assert all('content' not in r for r in processor.get_all_sermons_metadata(db_path))
+        exported = processor.export_sermons(db_path, ["2024"])
+        assert len(exported) == 3 and exported[0]['content']
+
+def test_previews_from_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _synced_library(tmp)
+        for q in ("천지를", "믿음"):   # trigram snippet() / 2글자 substr 미리보기
+            for r in processor.search_sermons(db_path, q, []):
+                assert r['hits'] == 1
+                assert r['highlights']
+                for start, end in r['highlights']:
+                    assert r['snippet'][start:end] == q
+                body = processor.get_sermon_content(db_path, r['id'])
+                assert body[r['first_hit']:r['first_hit'] + len(q)] == q
+
+def test_bible_filter_uses_refs():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _synced_library(tmp)
+        _write_samples(folder, {"2024-05-05 애가 3장.txt": "예레미야애가 3:22-23 여호와의 인자와 긍휼이 무궁하시도다"})
+        processor.sync_files(folder, db_path)
+        # LIKE '%예레미야%'는 예레미야애가도 잡았음
+        assert processor.count_sermons(db_path, "", ["예레미야"]) == 0
+        assert processor.count_sermons(db_path, "", ["예레미야애가"]) == 1
+        assert processor.count_sermons(db_path, "", ["창세기", "로마서"]) == 2
+        assert processor.get_book_counts(db_path) == {"창세기": 1, "요한복음": 1, "로마서": 1, "예레미야애가": 1}
+
+def test_bible_order_sort():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _synced_library(tmp)
+        _write_samples(folder, {
+            "2024-06-02 사람의 창조.txt": "창세기 1:26 우리의 형상을 따라",
+            "2024-06-09 무제.txt": "성경 본문 없음",
+            # 본문의 창세기가 아니라 제목의 본문이 대표 본문
+            "2024-06-16 요한복음 3장 16절 설교.txt": "창세기 1:1 말씀과 함께 읽습니다",
+        })
+        processor.sync_files(folder, db_path)
+        rows = processor.search_sermons(db_path, "", [], sort="bible", limit=3, offset=0)
+        rows += processor.search_sermons(db_path, "", [], sort="bible", limit=3, offset=3)
+        assert [r['title'] for r in rows] == [
+            "2024-01-07 창세기 1장 태초에",    # 창 1장 (절 없음)
+            "2024-06-02 사람의 창조",          # 창 1:26
+            "2024-02-04 요한복음 3장",
+            "2024-06-16 요한복음 3장 16절 설교",
+            "2024-03-03 로마서 1장",
+            "2024-06-09 무제",                 # 태그 없는 설교는 맨 뒤
+        ]
+
+def test_result_cache_invalidation():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _synced_library(tmp)
+        first = processor.search_sermons(db_path, "하나님", [], limit=30)
+        first[0]['title'] = "변경"   # 호출한 쪽의 수정이 캐시에 남으면 안 됨
+        assert processor.search_sermons(db_path, "하나님", [], limit=30)[0]['title'] != "변경"
+        # 캐시된 결과는 DB를 다시 읽지 않음
+        assert processor.count_sermons(db_path, "하나님", []) == 2
+        os.rename(db_path, db_path + ".moved")
+        assert processor.count_sermons(db_path, "하나님", []) == 2
+        os.rename(db_path + ".moved", db_path)
+        _write_samples(folder, {"2024-07-07 하나님의 나라.txt": "하나님의 나라와 의"})
+        processor.sync_files(folder, db_path)
+        assert processor.count_sermons(db_path, "하나님", []) == 3
+        processor.reset_db(db_path)
+        assert processor.count_sermons(db_path, "하나님", []) == 0
+
+def test_index_follows_sync():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _synced_library(tmp)
+        path = os.path.join(folder, "2024-02-04 요한복음 3장.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("요한복음 3:16 독생자를 주셨으니")
+        os.utime(path, (1, 1))
+        processor.sync_files(folder, db_path)
+        assert processor.search_sermons(db_path, "영생", []) == []
+        assert len(processor.search_sermons(db_path, "독생자", [])) == 1
+
+        os.remove(os.path.join(folder, "2024-03-03 로마서 1장.txt"))
+        processor.sync_files(folder, db_path)
+        assert len(processor.search_sermons(db_path, "믿음", [])) == 1
+
+def test_backfill_existing_db():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "library.db")
+        # 색인이 없던 이전 버전 library.db
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE sermons (id INTEGER PRIMARY KEY AUTOINCREMENT, file_name TEXT UNIQUE, title TEXT, date TEXT, content TEXT, bible_tags TEXT, bible_chapter INTEGER DEFAULT 0, last_modified FLOAT)")
+        conn.execute("INSERT INTO sermons (file_name, title, date, content, bible_tags, last_modified) VALUES ('a.txt', 'a', '', '은혜 위에 은혜러라', '', 0)")
+        conn.commit()
+        conn.close()
+        processor.init_db(db_path)
+        assert len(processor.search_sermons(db_path, "은혜", [])) == 1
+        # 이전 버전의 본문도 압축해 둠
+        rows = processor.search_sermons(db_path, "은혜", [])
+        assert processor.get_sermon_content(db_path, rows[0]['id']) == "은혜 위에 은혜러라"
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT typeof(content) FROM sermons").fetchall() == [("blob",)]
+        conn.close()
+
+def test_first_ref_recomputed_on_upgrade():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _synced_library(tmp)
+        # 책 순서로 본문을 찾던 이전 버전이 저장한 대표 본문 (요한복음 설교인데 창세기)
+        processor.db.close_all(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE sermons SET bible_book_idx=0, bible_chapter=1, bible_verse=1 WHERE title LIKE '%요한복음%'")
+        conn.execute("PRAGMA user_version = 10")
+        conn.commit()
+        conn.close()
+        processor._initialized.discard(db_path)
+        processor.init_db(db_path)
+        rows = processor.search_sermons(db_path, "", [], sort="bible")
+        assert [r['title'] for r in rows] == ["2024-01-07 창세기 1장 태초에", "2024-02-04 요한복음 3장", "2024-03-03 로마서 1장"]
+
+def test_content_stored_compressed():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _synced_library(tmp)
+        conn = sqlite3.connect(db_path)
+        stored = conn.execute("SELECT typeof(content) FROM sermons").fetchall()
+        conn.close()
+        assert stored == [("blob",)] * 3
+        for r in processor.search_sermons(db_path, "", []):
+            assert processor.get_sermon_content(db_path, r['id']) == SAMPLES[r['file_name']]
+        # 짧은 검색어(LIKE)와 미리보기는 색인의 원문으로
+        rows = processor.search_sermons(db_path, "삶", [])
+        assert len(rows) == 1 and rows[0]['hits'] == 1 and "삶" in rows[0]['snippet']
+        assert "천지를 창조" in processor.get_wordcloud_text(db_path)
+        exported = processor.export_sermons(db_path, ["2024"])
+        assert sorted(r['content'] for r in exported) == sorted(SAMPLES.values())
+
+if __name__ == "__main__":
+    test_search_uses_index()
+    test_korean_substring_match()
+    test_rank_prefers_title_hits()
+    test_pagination()
+    test_results_without_content()
+    test_previews_from_index()
+    test_bible_filter_uses_refs()
+    test_bible_order_sort()
+    test_result_cache_invalidation()
+    test_index_follows_sync()
+    test_backfill_existing_db()
+    test_first_ref_recomputed_on_upgrade()
+    test_content_stored_compressed()
+    print("SUCCESS")
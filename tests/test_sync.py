@@ -0,0 +1,518 @@
+"""
+동기화(sync_files) 테스트
+임시 폴더의 txt 설교로 변경 감지와 재추출 여부를 검증합니다.
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import processor, scanner, watcher, sync_job, extract_cache
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+class _ExtractionCounter:
+    """processor._process_single_file 호출 횟수를 셉니다."""
+    def __init__(self):
+        self.calls = 0
+        self._original = processor._process_single_file
+
+    def __enter__(self):
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return self._original(*args, **kwargs)
+        processor._process_single_file = counted
+        return self
+
+    def __exit__(self, *exc):
+        processor._process_single_file = self._original
+
+def _new_library(tmp):
+    folder = os.path.join(tmp, "sermons")
+    _write(os.path.join(folder, "2023", "설교.txt"), "2023년 설교 창세기 1:1 빛이 있으라")
+    _write(os.path.join(folder, "2024", "설교.txt"), "2024년 설교 요한복음 1:1 태초에 말씀이")
+    _write(os.path.join(folder, "2024-03-03 로마서.txt"), "롬 1:17 의인은 믿음으로")
+    db_path = os.path.join(tmp, "library.db")
+    processor.init_db(db_path)
+    return folder, db_path
+
+def test_same_name_in_subfolders():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        cnt, _ = processor.sync_files(folder, db_path)
+        assert cnt == 3
+        assert processor.count_sermons(db_path, "년 설교", []) == 2
+
+def test_unchanged_tree_is_not_extracted():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        processor.sync_files(folder, db_path)
+        with _ExtractionCounter() as counter:
+            cnt, _ = processor.sync_files(folder, db_path)
+        assert (cnt, counter.calls) == (0, 0)
+
+        # 수정 시각만 바뀐 파일은 해시로 확인하고 추출하지 않음
+        path = os.path.join(folder, "2023", "설교.txt")
+        os.utime(path, (1000, 1000))
+        with _ExtractionCounter() as counter:
+            cnt, _ = processor.sync_files(folder, db_path)
+        assert (cnt, counter.calls) == (0, 0)
+
+        _write(path, "2023년 설교 고쳐 씀")
+        with _ExtractionCounter() as counter:
+            cnt, _ = processor.sync_files(folder, db_path)
+        assert (cnt, counter.calls) == (1, 1)
+        assert processor.count_sermons(db_path, "고쳐 씀", []) == 1
+
+def test_legacy_rows_are_adopted():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, "sermons")
+        path = os.path.join(folder, "2024-03-03 로마서.txt")
+        _write(path, "롬 1:17 의인은 믿음으로")
+        db_path = os.path.join(tmp, "library.db")
+        # 파일명을 키로 쓰던 이전 버전 library.db
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE sermons (id INTEGER PRIMARY KEY AUTOINCREMENT, file_name TEXT UNIQUE, title TEXT, date TEXT, content TEXT, bible_tags TEXT, bible_chapter INTEGER DEFAULT 0, last_modified FLOAT)")
+        conn.execute("INSERT INTO sermons (file_name, title, date, content, bible_tags, bible_chapter, last_modified) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     ("2024-03-03 로마서.txt", "2024-03-03 로마서", "2024-03-03", "롬 1:17 의인은 믿음으로", "로마서", 1, os.path.getmtime(path)))
+        conn.execute("INSERT INTO sermons (file_name, title, date, content, bible_tags, bible_chapter, last_modified) VALUES ('지워진.txt', '지워진', '', '', '', 0, 0)")
+        conn.commit()
+        conn.close()
+        processor.init_db(db_path)
+        # 미리 보기도 이전 버전 설교를 이어받을 것으로 계산 (전부 새 파일로 보지 않음)
+        plan = processor.sync_files(folder, db_path, dry_run=True)
+        assert plan['extract_files'] == 0
+        assert [(f['format'], f['new'], f['unchanged']) for f in plan['formats']] == [("txt", 0, 1)]
+        # 동기화한 적 없는 다른 폴더를 빼도 이어받을 설교는 남음
+        assert processor.remove_root(db_path, os.path.join(tmp, "다른 폴더")) == 0
+        with _ExtractionCounter() as counter:
+            cnt, msg = processor.sync_files(folder, db_path)
+        assert (cnt, counter.calls) == (0, 0)
+        assert "1개 삭제됨" in msg
+        assert processor.count_sermons(db_path, "의인은", []) == 1
+
+def test_skip_folders():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        _write(os.path.join(folder, "2023", "초안", "메모.txt"), "초안 메모")
+        _write(os.path.join(folder, ".git", "설교.txt"), "숨은 폴더")
+        _write(os.path.join(folder, "목록.xlsx"), "")
+        cnt, _ = processor.sync_files(folder, db_path, skip_folders=["2023/초안"])
+        assert cnt == 3
+        # 제외 목록에 추가하면 이미 들어간 설교도 삭제됨
+        cnt, msg = processor.sync_files(folder, db_path, skip_folders=["2024"])
+        assert cnt == 1 and "1개 삭제됨" in msg
+        assert processor.count_sermons(db_path, "초안 메모", []) == 1
+        assert processor.count_sermons(db_path, "2024년", []) == 0
+
+def test_process_pool_extraction():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        for i in range(8):
+            _write(os.path.join(folder, "2025", f"2025-01-{i + 1:02d} 시편 {i + 1}편.txt"), f"시편 {i + 1}:1 복 있는 사람은")
+        cnt, _ = processor.sync_files(folder, db_path, extract_mode="process", workers=2)
+        assert cnt == 11
+        assert processor.count_sermons(db_path, "복 있는", ["시편"]) == 8
+        assert processor.count_sermons(db_path, "2023년", ["창세기"]) == 1
+
+def test_streaming_writer_batches():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        for i in range(7):
+            _write(os.path.join(folder, "2022", f"2022-02-{i + 1:02d} 마가복음.txt"), f"막 {i + 1}:1 회개하라")
+        original = processor.WRITE_BATCH_SIZE
+        processor.WRITE_BATCH_SIZE = 3
+        seen = []
+        try:
+            # 진행 중에도 이미 커밋된 묶음은 검색되어야 함
+            cnt, _ = processor.sync_files(folder, db_path,
+                                          status_callback=lambda _: seen.append(processor.count_sermons(db_path, "", [])))
+        finally:
+            processor.WRITE_BATCH_SIZE = original
+        assert cnt == 10
+        assert seen == sorted(seen) and seen[-1] <= 10
+        assert processor.count_sermons(db_path, "회개하라", ["마가복음"]) == 7
+        assert processor.count_sermons(db_path, "", []) == 10
+
+def test_sync_paths_only_touches_given_paths():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        processor.sync_files(folder, db_path)
+        _write(os.path.join(folder, "2024", "설교.txt"), "2024년 설교 고쳐 씀")
+        _write(os.path.join(folder, "2023", "설교.txt"), "2023년 설교 다른 변경")
+        os.remove(os.path.join(folder, "2024-03-03 로마서.txt"))
+        with _ExtractionCounter() as counter:
+            cnt, msg = processor.sync_paths(folder, db_path, ["2024/설교.txt", "2024-03-03 로마서.txt"])
+        assert (cnt, counter.calls) == (1, 1) and "1개 삭제됨" in msg
+        # 넘기지 않은 경로의 변경은 다음 반영 때까지 그대로
+        assert processor.count_sermons(db_path, "다른 변경", []) == 0
+        assert processor.count_sermons(db_path, "고쳐 씀", []) == 1
+
+        # 폴더째 옮기기: 이전 경로는 삭제, 새 경로는 추출
+        os.rename(os.path.join(folder, "2023"), os.path.join(folder, "옛 설교"))
+        cnt, msg = processor.sync_paths(folder, db_path, ["2023", "옛 설교"])
+        assert cnt == 1 and "1개 삭제됨" in msg
+        assert processor.count_sermons(db_path, "다른 변경", []) == 1
+
+def test_watcher_debounces_events():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        processor.sync_files(folder, db_path)
+        path = os.path.join(folder, "2024", "새 설교.txt")
+        _write(path, "새로 쓴 설교")
+        w = watcher.FolderWatcher(folder, db_path)
+        # 저장 한 번에 여러 이벤트가 와도 한 번만 추출, 상위 폴더 이벤트에 포함된 경로는 한 번만 처리
+        for p in (path, path, os.path.join(folder, "2024"), os.path.join(tmp, "밖.txt")):
+            w.add(p)
+        with _ExtractionCounter() as counter:
+            assert w.flush() == 1
+            assert w.flush() == 0
+        assert counter.calls == 1
+        assert processor.count_sermons(db_path, "새로 쓴", []) == 1
+
+def test_background_sync_cancel_and_resume():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        for i in range(20):
+            _write(os.path.join(folder, "2021", f"2021-03-{i + 1:02d} 누가복음.txt"), f"눅 {i + 1}:1 은혜")
+        original = processor._process_single_file
+        def cancel_on_first_file(*args):
+            sync_job.cancel(db_path)
+            time.sleep(0.05)   # 다른 파일이 모두 끝나기 전에 중단이 반영되도록
+            return original(*args)
+        processor._process_single_file = cancel_on_first_file
+        try:
+            assert sync_job.start(folder, db_path) is not None
+            sync_job.wait(db_path)
+        finally:
+            processor._process_single_file = original
+        first = sync_job.get_status(db_path)
+        assert first['status'] == "cancelled" and "중단됨" in first['message']
+        saved = processor.count_sermons(db_path, "", [])
+        assert 0 < saved < 23
+
+        # 다시 시작하면 저장되지 않은 파일만 추출
+        with _ExtractionCounter() as counter:
+            sync_job.start(folder, db_path)
+            sync_job.wait(db_path)
+        status = sync_job.get_status(db_path)
+        assert (status['status'], status['progress'], status['error_count']) == ("done", 1.0, 0)
+        assert counter.calls == 23 - saved
+        assert processor.count_sermons(db_path, "", []) == 23
+
+def test_background_sync_records_errors():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        original = processor._process_single_file
+        def broken(file_path, rel_path, *args):
+            if "로마서" in rel_path:
+                raise ValueError("손상된 파일")
+            return original(file_path, rel_path, *args)
+        processor._process_single_file = broken
+        try:
+            sync_job.start(folder, db_path)
+            sync_job.wait(db_path)
+        finally:
+            processor._process_single_file = original
+        status = sync_job.get_status(db_path)
+        assert status['status'] == "done" and "1개 격리됨" in status['message']
+        assert status['errors'] == [("2024-03-03 로마서.txt", "손상된 파일")]
+
+        # 격리된 파일은 바뀔 때까지 다시 추출하지 않음
+        with _ExtractionCounter() as counter:
+            cnt, msg = processor.sync_files(folder, db_path)
+        assert (cnt, counter.calls) == (0, 0) and "1개 격리됨" in msg
+        assert [q['reason'] for q in processor.get_quarantine(db_path)] == ["ValueError"]
+        _write(os.path.join(folder, "2024-03-03 로마서.txt"), "롬 1:17 의인은 믿음으로 살리라")
+        cnt, msg = processor.sync_files(folder, db_path)
+        assert cnt == 1 and "격리" not in msg
+        assert processor.get_quarantine(db_path) == []
+
+def test_extraction_cache_survives_reset_and_rename():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        calls = []
+        original = processor._extract_text
+        processor._extract_text = lambda path: calls.append(path) or original(path)
+        try:
+            processor.sync_files(folder, db_path)
+            assert len(calls) == 3
+            processor.reset_db(db_path)
+            os.rename(os.path.join(folder, "2024-03-03 로마서.txt"), os.path.join(folder, "2024-03-10 로마서 강해.txt"))
+            cnt, _ = processor.sync_files(folder, db_path)
+            assert (cnt, len(calls)) == (3, 3)
+            # 이름이 바뀌어도 제목/날짜는 새 파일명 기준
+            rows = processor.search_sermons(db_path, "의인은", ["로마서"])
+            assert [(r['title'], r['date']) for r in rows] == [("2024-03-10 로마서 강해", "2024-03-10")]
+
+            # 내용이 바뀐 파일만 다시 추출하고, 이전 판본의 캐시는 정리됨
+            _write(os.path.join(folder, "2023", "설교.txt"), "2023년 설교 고쳐 씀")
+            processor.sync_files(folder, db_path)
+            assert len(calls) == 4
+            cache_dir = extract_cache.cache_dir_for(db_path)
+            assert sum(len(files) for _, _, files in os.walk(cache_dir)) == 3
+        finally:
+            processor._extract_text = original
+
+def test_timing_report():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        processor.sync_files(folder, db_path)
+        processor.reset_db(db_path)   # 다시 동기화하면 추출 캐시를 씀
+        processor.sync_files(folder, db_path)
+        runs = processor.get_sync_runs(db_path)
+        assert [(r['kind'], r['files'], r['extracted'], r['failed']) for r in runs] == [("full", 3, 3, 0)]
+        report = processor.get_timing_report(db_path, runs[0]['id'])
+        assert [(f['format'], f['files'], f['cached']) for f in report['formats']] == [("txt", 3, 3)]
+        assert len(report['slowest']) == 3
+        assert report['slowest'][0]['total_seconds'] >= report['slowest'][-1]['total_seconds']
+        assert {r['chars'] for r in report['slowest']} == {len("2023년 설교 창세기 1:1 빛이 있으라"),
+                                                           len("2024년 설교 요한복음 1:1 태초에 말씀이"),
+                                                           len("롬 1:17 의인은 믿음으로")}
+
+        _write(os.path.join(folder, "2023", "설교.txt"), "2023년 설교 고쳐 씀")
+        processor.sync_files(folder, db_path)
+        runs = processor.get_sync_runs(db_path)
+        fmt = processor.get_timing_report(db_path, runs[0]['id'])['formats'][0]
+        assert (len(runs), fmt['files'], fmt['cached']) == (2, 1, 0)
+        assert fmt['p50'] <= fmt['p95'] and fmt['mb_per_s'] > 0
+
+def test_sync_runs_kept_per_kind():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        processor.sync_files(folder, db_path)
+        kept = processor.SYNC_RUNS_KEPT
+        processor.SYNC_RUNS_KEPT = 2
+        try:
+            # 폴더 감시가 자주 남기는 paths 기록이 전체 동기화 기록을 밀어내지 않음
+            for i in range(3):
+                _write(os.path.join(folder, "2024", "설교.txt"), f"2024년 설교 {i}번째 고침")
+                processor.sync_paths(folder, db_path, ["2024/설교.txt"])
+        finally:
+            processor.SYNC_RUNS_KEPT = kept
+        runs = processor.get_sync_runs(db_path)
+        assert [r['kind'] for r in runs] == ["paths", "paths", "full"]
+        report = processor.get_timing_report(db_path, runs[-1]['id'])
+        assert report['formats'][0]['files'] == 3
+
+def test_moved_folder_keeps_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        processor.sync_files(folder, db_path)
+        ids = sorted(r['id'] for r in processor.get_all_sermons_metadata(db_path) if r['title'] == "설교")
+        os.makedirs(os.path.join(folder, "보관"))
+        os.rename(os.path.join(folder, "2024"), os.path.join(folder, "보관", "2024"))
+        os.remove(os.path.join(folder, "2024-03-03 로마서.txt"))
+        with _ExtractionCounter() as counter:
+            cnt, msg = processor.sync_files(folder, db_path)
+        assert (cnt, counter.calls) == (0, 0)
+        assert "1개 이동됨" in msg and "1개 삭제됨" in msg
+        # 옮긴 설교는 같은 행(id)이 그대로 남고 색인도 유지됨
+        assert sorted(r['id'] for r in processor.get_all_sermons_metadata(db_path)) == ids
+        assert processor.count_sermons(db_path, "2024년 설교", []) == 1
+        assert processor.count_sermons(db_path, "의인은", []) == 0
+        # 이후에는 새 경로로 추적
+        with _ExtractionCounter() as counter:
+            cnt, msg = processor.sync_files(folder, db_path)
+        assert (cnt, counter.calls) == (0, 0) and "이동" not in msg
+
+def test_newest_sermons_first():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        _write(os.path.join(folder, "2019", "2019-12-25 성탄.txt"), "눅 2:11")
+        _write(os.path.join(folder, "메모.txt"), "날짜 없는 파일")
+        os.utime(os.path.join(folder, "메모.txt"), (1700000000, 1700000000))   # 2023-11-14
+        for name in ("2023/설교.txt", "2024/설교.txt"):
+            os.utime(os.path.join(folder, name), (1600000000, 1600000000))     # 2020-09-13
+        order = []
+        processor.sync_files(folder, db_path, status_callback=order.append, workers=1)
+        assert order == ["처리 중: 2024-03-03 로마서.txt", "처리 중: 메모.txt",
+                         "처리 중: 설교.txt", "처리 중: 설교.txt", "처리 중: 2019-12-25 성탄.txt"]
+
+def test_dry_run_plan():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        plan = processor.sync_files(folder, db_path, dry_run=True)
+        assert plan['estimated_seconds'] is None   # 아직 처리 기록 없음
+        assert (plan['total'], plan['extract_files']) == (3, 3)
+        assert processor.get_stats(db_path)[0] == 0 and not processor.get_sync_runs(db_path)
+
+        processor.sync_files(folder, db_path)
+        _write(os.path.join(folder, "2023", "설교.txt"), "2023년 설교 고쳐 씀")
+        _write(os.path.join(folder, "새 설교.docx"), "아직 추출하지 않음")   # 기록 없는 형식은 전체 평균으로 추정
+        os.remove(os.path.join(folder, "2024", "설교.txt"))
+        with _ExtractionCounter() as counter:
+            plan = processor.sync_files(folder, db_path, dry_run=True)
+        assert counter.calls == 0
+        assert [(f['format'], f['new'], f['changed'], f['deleted'], f['unchanged']) for f in plan['formats']] == \
+            [("docx", 1, 0, 0, 0), ("txt", 0, 1, 1, 1)]
+        assert plan['extract_files'] == 2 and plan['estimated_seconds'] > 0
+        assert processor.get_stats(db_path)[0] == 3
+
+def test_library_roots():
+    with tempfile.TemporaryDirectory() as tmp:
+        local, db_path = _new_library(tmp)
+        drive = os.path.join(tmp, "drive")
+        _write(os.path.join(drive, "2024", "설교.txt"), "드라이브 설교 시편 23:1")
+        release = threading.Event()
+        original = processor._process_single_file
+
+        def slow_drive(file_path, rel_path, cache_dir=None):
+            if file_path.startswith(drive):
+                release.wait(5)   # 느린 네트워크 드라이브
+            return original(file_path, rel_path, cache_dir)
+
+        processor._process_single_file = slow_drive
+        try:
+            sync_job.start(drive, db_path)
+            sync_job.start(local, db_path)
+            sync_job.wait(db_path, target_folder=local)
+            assert sync_job.get_status(db_path, local)['status'] == "done"
+            assert sync_job.is_running(db_path, drive)
+            # 가장 최근 작업(로컬)은 끝났지만 실행 중인 폴더는 드라이브 (사이드바 표시)
+            assert sync_job.get_status(db_path)['target_folder'] == local
+            assert sync_job.running_folders(db_path) == [drive]
+            assert processor.count_sermons(db_path, "년 설교", []) == 2
+            release.set()
+            sync_job.wait(db_path)
+        finally:
+            processor._process_single_file = original
+        assert sync_job.get_status(db_path, drive)['status'] == "done"
+        # 같은 상대 경로(2024/설교.txt)도 폴더마다 따로
+        rows = processor.search_sermons(db_path, "설교", [])
+        assert sorted((r['root'], r['title']) for r in rows if r['title'] == "설교") == \
+            sorted([(os.path.abspath(local), "설교"), (os.path.abspath(local), "설교"), (os.path.abspath(drive), "설교")])
+        # 두 작업이 동시에 폴더를 등록하므로 id 순서는 정해지지 않음
+        assert sorted((r['path'], r['sermons']) for r in processor.get_roots(db_path)) == \
+            sorted([(os.path.abspath(local), 3), (os.path.abspath(drive), 1)])
+        with _ExtractionCounter() as counter:
+            cnt, _ = processor.sync_files(drive, db_path)
+        assert (cnt, counter.calls) == (0, 0)
+        assert processor.remove_root(db_path, drive) == 1
+        assert processor.count_sermons(db_path, "드라이브", []) == 0
+        assert processor.count_sermons(db_path, "년 설교", []) == 2
+
+def test_cache_prune_keeps_other_roots():
+    with tempfile.TemporaryDirectory() as tmp:
+        local, db_path = _new_library(tmp)
+        drive = os.path.join(tmp, "drive")
+        _write(os.path.join(drive, "2024", "설교.txt"), "드라이브 설교 시편 23:1")
+        processor.sync_files(local, db_path)
+        processor.sync_files(drive, db_path)
+        # DB 초기화 뒤 한 폴더만 동기화하고 지운 파일이 있어도, 아직 동기화하지 않은 폴더의 캐시는 남음
+        processor.reset_db(db_path)
+        os.remove(os.path.join(local, "2023", "설교.txt"))
+        processor.sync_files(local, db_path)
+        _write(os.path.join(local, "2024", "설교.txt"), "2024년 설교 고쳐 씀")
+        processor.sync_files(local, db_path)
+        calls = []
+        original = processor._extract_text
+        processor._extract_text = lambda path: calls.append(path) or original(path)
+        try:
+            cnt, _ = processor.sync_files(drive, db_path)
+        finally:
+            processor._extract_text = original
+        assert (cnt, calls) == (1, [])
+        # 고치기 전 판본(이 폴더가 쓰던 해시)은 정리됨. 2023/설교.txt는 초기화 전 기록이라 남음
+        cache_dir = extract_cache.cache_dir_for(db_path)
+        assert sum(len(files) for _, _, files in os.walk(cache_dir)) == 4
+
+def test_cloud_scan_mode():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        for i in range(10):
+            _write(os.path.join(folder, "2022", f"{i}.txt"), f"2022년 설교 {i}")
+        stat_batch, scanner.STAT_BATCH = scanner.STAT_BATCH, 3
+        try:
+            expected = sorted(scanner.scan_files(folder, ["2023"]))
+            assert sorted(scanner.scan_files_parallel(folder, ["2023"], workers=3)) == expected and len(expected) == 12
+        finally:
+            scanner.STAT_BATCH = stat_batch
+        processor.sync_files(folder, db_path, scan_mode="cloud")
+
+        opened = []
+        original = processor._file_hash
+
+        def recording_hash(file_path):
+            opened.append(os.path.relpath(file_path, folder).replace(os.sep, "/"))
+            return original(file_path)
+
+        os.utime(os.path.join(folder, "2023", "설교.txt"), (1600000000, 1600000000))   # 시각만 바뀜
+        _write(os.path.join(folder, "새 설교.txt"), "새 설교")
+        os.rename(os.path.join(folder, "2022"), os.path.join(folder, "옛 설교"))
+        processor._file_hash = recording_hash
+        try:
+            cnt, msg = processor.sync_files(folder, db_path, scan_mode="cloud")
+        finally:
+            processor._file_hash = original
+        # 메타데이터가 바뀐 파일만 열고, 옮겨진 폴더는 파일명/크기/수정 시각으로 짝지음
+        assert sorted(opened) == ["2023/설교.txt", "새 설교.txt"]
+        assert cnt == 2 and "10개 이동됨" in msg
+        assert processor.count_sermons(db_path, "2022년 설교", []) == 10
+
+def test_locked_file_does_not_abort_sync():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder, db_path = _new_library(tmp)
+        processor.sync_files(folder, db_path)
+        locked = os.path.join(folder, "2023", "설교.txt")
+        os.utime(locked, (1600000000, 1600000000))   # 시각이 바뀌어 해시로 확인해야 하는 파일
+        _write(os.path.join(folder, "새 설교.txt"), "새로 쓴 설교")
+        original = processor._file_hash
+
+        def locked_hash(file_path):
+            if file_path == locked:
+                raise PermissionError("다른 프로그램이 사용 중")
+            return original(file_path)
+
+        processor._file_hash = locked_hash
+        try:
+            cnt, _ = processor.sync_files(folder, db_path)
+        finally:
+            processor._file_hash = original
+        assert cnt == 1 and processor.count_sermons(db_path, "새로 쓴", []) == 1
+        assert [q['rel_path'] for q in processor.get_quarantine(db_path)] == ["2023/설교.txt"]
+
+def test_corrupt_files_are_quarantined():
+    # 추출기가 예외를 삼키면 손상된 파일이 빈 설교로 저장되므로, 두 추출 방식 모두 격리되는지 확인
+    for extract_mode in ("thread", "process"):
+        with tempfile.TemporaryDirectory() as tmp:
+            folder, db_path = _new_library(tmp)
+            _write(os.path.join(folder, "깨진 설교.hwpx"), "zip 파일이 아님")
+            with open(os.path.join(folder, "다른 인코딩.txt"), "wb") as f:
+                f.write("euc-kr로 저장된 설교".encode("euc-kr"))
+            cnt, msg = processor.sync_files(folder, db_path, extract_mode=extract_mode, workers=2)
+            assert cnt == 3 and "2개 격리됨" in msg
+            reasons = {q['rel_path']: q['reason'] for q in processor.get_quarantine(db_path)}
+            assert reasons == {"깨진 설교.hwpx": "BadZipFile", "다른 인코딩.txt": "UnicodeDecodeError"}
+
+if __name__ == "__main__":
+    test_same_name_in_subfolders()
+    test_unchanged_tree_is_not_extracted()
+    test_legacy_rows_are_adopted()
+    test_skip_folders()
+    test_process_pool_extraction()
+    test_streaming_writer_batches()
+    test_sync_paths_only_touches_given_paths()
+    test_watcher_debounces_events()
+    test_background_sync_cancel_and_resume()
+    test_background_sync_records_errors()
+    test_extraction_cache_survives_reset_and_rename()
+    test_timing_report()
+    test_sync_runs_kept_per_kind()
+    test_moved_folder_keeps_rows()
+    test_newest_sermons_first()
+    test_dry_run_plan()
+    test_library_roots()
+    test_cache_prune_keeps_other_roots()
+    test_cloud_scan_mode()
+    test_locked_file_does_not_abort_sync()
+    test_corrupt_files_are_quarantined()
+    print("SUCCESS")
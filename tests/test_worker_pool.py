@@ -0,0 +1,108 @@
+"""
+추출 작업자 풀(worker_pool.IsolatedPool) 테스트
+제한 시간/메모리를 넘거나 비정상 종료한 작업자만 끝내고 나머지 작업은 계속되는지 검증합니다.
+"""
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import worker_pool
+
+def test_results_and_timeout():
+    with worker_pool.IsolatedPool(2, timeout=1.0) as pool:
+        hung = pool.submit(time.sleep, 30)
+        results = [pool.submit(pow, 2, n) for n in range(5)]
+        start = time.monotonic()
+        try:
+            hung.result()
+            assert False, "시간 초과가 나야 함"
+        except worker_pool.ExtractionTimeout:
+            pass
+        assert time.monotonic() - start < 10
+        assert [f.result() for f in results] == [1, 2, 4, 8, 16]
+        # 종료된 작업자 대신 새 작업자가 뜸
+        assert pool.submit(pow, 3, 2).result() == 9
+
+def test_crash_and_error():
+    with worker_pool.IsolatedPool(1) as pool:
+        crashed = pool.submit(os._exit, 3)
+        failed = pool.submit(int, "숫자 아님")
+        ok = pool.submit(abs, -7)
+        try:
+            crashed.result()
+            assert False, "작업자 비정상 종료가 전달되어야 함"
+        except worker_pool.WorkerCrashed:
+            pass
+        try:
+            failed.result()
+            assert False
+        except worker_pool.WorkerError as e:
+            assert e.type_name == "ValueError"
+            assert "숫자 아님" in str(e)
+        assert ok.result() == 7
+
+def test_memory_limit():
+    if worker_pool._rss_bytes(os.getpid()) is None:
+        return  # 메모리 사용량을 읽을 수 없는 OS
+    # 1MB는 빈 파이썬 프로세스도 넘으므로 오래 걸리는 작업은 메모리 초과로 끝남
+    with worker_pool.IsolatedPool(1, memory_limit_mb=1) as pool:
+        try:
+            pool.submit(time.sleep, 30).result()
+            assert False
+        except worker_pool.ExtractionMemoryExceeded:
+            pass
+
+def test_worker_start_failure():
+    with worker_pool.IsolatedPool(1) as pool:
+        original = worker_pool._Worker
+
+        def no_process(context):
+            raise OSError(24, "Too many open files")
+
+        worker_pool._Worker = no_process
+        try:
+            failed = pool.submit(len, "abc")
+            try:
+                failed.result(timeout=10)
+                assert False, "작업자를 띄우지 못한 작업은 실패해야 함"
+            except worker_pool.WorkerCrashed as e:
+                assert "Too many open files" in str(e)
+        finally:
+            worker_pool._Worker = original
+        # 관리 스레드는 살아 있고 다음 작업은 새 작업자로 처리됨
+        assert pool._manager.is_alive()
+        assert pool.submit(len, "abcd").result(timeout=30) == 4
+
+def test_manager_failure_fails_pending_work():
+    pool = worker_pool.IsolatedPool(1)
+    running = pool.submit(time.sleep, 30)
+    queued = pool.submit(abs, -1)
+
+    def broken(worker):
+        raise RuntimeError("관리 스레드 오류")
+
+    pool._check_limits = broken
+    for future in (running, queued):
+        try:
+            future.result(timeout=30)
+            assert False, "관리 스레드가 멈추면 남은 작업이 실패해야 함"
+        except worker_pool.WorkerCrashed as e:
+            assert "관리 스레드 오류" in str(e)
+    pool._manager.join(10)
+    assert not pool._manager.is_alive()
+    try:
+        pool.submit(abs, -2)
+        assert False
+    except worker_pool.WorkerCrashed:
+        pass
+
+if __name__ == "__main__":
+    test_results_and_timeout()
+    test_crash_and_error()
+    test_memory_limit()
+    test_worker_start_failure()
+    test_manager_failure_fails_pending_work()
+    print("SUCCESS")